@@ -61,9 +61,9 @@ def demo_competitive_intelligence():
                 print(f"   🎯 Opportunity Level: {opportunity}")
                 
                 # Show strategic recommendations
-                recs = result.get('pokitpal_strategic_recommendations', [])
+                recs = result.get('pokitpal_strategic_recommendations', '')
                 if recs:
-                    print(f"   💡 Strategic Recommendation: {recs[0]}")
+                    print(f"   💡 Strategic Recommendation: {recs.split('; ')[0]}")
             
             # Save results
             scraper.save_intelligence_results(results, "competitive_demo", "standard")
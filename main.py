@@ -10,6 +10,8 @@ Usage:
     python main.py              # Interactive mode
     python main.py --production  # Run production scraper
     python main.py --optimized   # Run token-optimized scraper
+    python main.py --optimized --no-cache  # Re-run AI analysis instead of reusing cached results
+    python main.py --optimized --batch     # Use the OpenAI Batch API (half price, results within 24h)
 """
 
 import sys
@@ -63,7 +65,7 @@ def run_production_scraper():
     scraper.save_results(all_results, "production_combined")
     
     print(f"\n✅ Production scraping complete! Found {len(all_results)} offers")
-    print(f"📁 Results saved to production_*.csv and production_*.json")
+    print(f"📁 Results saved to production_*.csv and production_*.json.gz")
 
 def run_optimized_scraper():
     """Run the token-optimized scraper with intelligence levels"""
@@ -78,6 +80,9 @@ def run_optimized_scraper():
     
     from src.scrapers.token_optimized_scraper_v2 import TokenOptimizedAIScraper
     scraper = TokenOptimizedAIScraper()
+    scraper.refresh_llm_cache = '--no-cache' in sys.argv
+    # Batch runs are resumable: re-running with --batch picks up a batch that is still in progress
+    scrape = scraper.scrape_batch if '--batch' in sys.argv else scraper.scrape_with_intelligence_level
     
     # Intelligence level selection
     print("\n🧠 Select Intelligence Level:")
@@ -116,7 +121,10 @@ def run_optimized_scraper():
         print(f"{i}. {model_info['name']} (~${cost_estimate:.4f}/page)")
         
         # Add descriptive text
-        if model == "gpt-3.5-turbo":
+        if model == "gpt-4o-mini":
+            print("   • Cheapest per page, structured JSON output")
+            print("   • Recommended default")
+        elif model == "gpt-3.5-turbo":
             print("   • Fast and cost-effective")
             print("   • Great for high-volume processing")
         elif model == "gpt-4o":
@@ -126,7 +134,7 @@ def run_optimized_scraper():
         model_options[str(i)] = model
     
     model_choice = input(f"Enter model choice (1-{len(available_models)}): ").strip()
-    selected_model = model_options.get(model_choice, "gpt-3.5-turbo")
+    selected_model = model_options.get(model_choice, "gpt-4o-mini")
     
     model_info = scraper.get_model_info(selected_model)
     print(f"\n🎯 Selected: {intelligence_level.title()} Intelligence + {model_info['name']}")
@@ -195,7 +203,7 @@ def run_optimized_scraper():
 
     if site_choice in ["1", "3"]:
         print(f"\n📊 Scraping ShopBack with {intelligence_level} intelligence + {model_info['name']}...")
-        shopback_results = scraper.scrape_with_intelligence_level(
+        shopback_results = scrape(
             site_name="shopback", 
             intelligence_level=intelligence_level,
             model_name=selected_model,
@@ -214,7 +222,7 @@ def run_optimized_scraper():
             scraper.token_costs = 0.0
 
         print(f"\n📊 Scraping CashRewards with {intelligence_level} intelligence + {model_info['name']}...")
-        cashrewards_results = scraper.scrape_with_intelligence_level(
+        cashrewards_results = scrape(
             site_name="cashrewards",
             intelligence_level=intelligence_level,
             model_name=selected_model,
@@ -226,6 +234,8 @@ def run_optimized_scraper():
             scraper.save_intelligence_results(cashrewards_results, "cashrewards", intelligence_level)
             results.extend(cashrewards_results)
 
+    scraper.close()
+
     # Summary
     print(f"\n✅ Intelligent scraping complete!")
     print(f"🧠 Intelligence Level: {intelligence_level.title()}")
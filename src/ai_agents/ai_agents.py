@@ -2,7 +2,7 @@
 AI-Enhanced Cashback Scraper with Intelligent Agents
 """
 
-import json
+import orjson
 import re
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
@@ -15,7 +15,7 @@ import time
 import requests
 
 
-@dataclass
+@dataclass(slots=True)
 class ScrapingContext:
     """Context information for AI agents"""
     url: str
@@ -29,7 +29,7 @@ class ScrapingContext:
             self.previous_attempts = []
 
 
-@dataclass
+@dataclass(slots=True)
 class ExtractionResult:
     """Result from AI extraction"""
     merchant_name: str
@@ -149,7 +149,7 @@ Rules:
             
             # Parse JSON response
             try:
-                result_data = json.loads(result_text)
+                result_data = orjson.loads(result_text)
                 
                 if result_data.get("merchant_name") and result_data.get("cashback_offer"):
                     result = ExtractionResult(
@@ -163,7 +163,7 @@ Rules:
                     self.log_attempt(context, result, "LLM")
                     return result
                     
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 self.logger.error(f"Failed to parse LLM response as JSON: {result_text}")
                 
         except Exception as e:
@@ -176,6 +176,14 @@ Rules:
 class PatternLearningAgent(BaseAIAgent):
     """AI agent that learns patterns from successful extractions"""
     
+    # Cashback value patterns in priority order
+    CASHBACK_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'\d+\.?\d*%',  # Percentage
+        r'\$\d+\.?\d*',  # Dollar amount
+        r'\d+\.?\d*\s*points',  # Points
+        r'up to \d+',  # Up to X
+    ))
+    
     def __init__(self):
         super().__init__("Pattern_Learner")
         self.learned_patterns = self._load_patterns()
@@ -184,8 +192,8 @@ class PatternLearningAgent(BaseAIAgent):
     def _load_patterns(self) -> Dict:
         """Load previously learned patterns"""
         try:
-            with open("learned_patterns.json", "r") as f:
-                return json.load(f)
+            with open("learned_patterns.json", "rb") as f:
+                return orjson.loads(f.read())
         except FileNotFoundError:
             return {
                 "merchant_selectors": [],
@@ -195,8 +203,8 @@ class PatternLearningAgent(BaseAIAgent):
     
     def save_patterns(self):
         """Save learned patterns to file"""
-        with open("learned_patterns.json", "w") as f:
-            json.dump(self.learned_patterns, f, indent=2)
+        with open("learned_patterns.json", "wb") as f:
+            f.write(orjson.dumps(self.learned_patterns, option=orjson.OPT_INDENT_2))
     
     def learn_from_success(self, context: ScrapingContext, result: ExtractionResult):
         """Learn patterns from successful extraction"""
@@ -289,17 +297,10 @@ class PatternLearningAgent(BaseAIAgent):
         if element.parent:
             search_elements.extend(element.parent.find_all())
         
-        cashback_patterns = [
-            r'\d+\.?\d*%',  # Percentage
-            r'\$\d+\.?\d*',  # Dollar amount
-            r'\d+\.?\d*\s*points',  # Points
-            r'up to \d+',  # Up to X
-        ]
-        
         for search_element in search_elements[:10]:  # Limit search
             text = search_element.get_text()
-            for pattern in cashback_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
+            for pattern in self.CASHBACK_PATTERNS:
+                match = pattern.search(text)
                 if match:
                     return match.group()
         
@@ -309,6 +310,16 @@ class PatternLearningAgent(BaseAIAgent):
 class AdaptiveSelectorAgent(BaseAIAgent):
     """AI agent that adaptively finds selectors based on content analysis"""
     
+    # Whole-page fallback patterns in priority order
+    FALLBACK_CASHBACK_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'\d+\.?\d*%\s*cashback',
+        r'earn\s+\d+\.?\d*%',
+        r'up\s+to\s+\d+\.?\d*%',
+        r'\$\d+\.?\d*\s*cashback'
+    ))
+    
+    CASHBACK_INFO_RE = re.compile(r'\d+\.?\d*%|\$\d+|points|cashback|cash back|earn|reward', re.IGNORECASE)
+    
     def __init__(self):
         super().__init__("Adaptive_Selector")
         
@@ -394,15 +405,8 @@ class AdaptiveSelectorAgent(BaseAIAgent):
         
         # Fallback: search all text for cashback patterns
         all_text = soup.get_text()
-        patterns = [
-            r'\d+\.?\d*%\s*cashback',
-            r'earn\s+\d+\.?\d*%',
-            r'up\s+to\s+\d+\.?\d*%',
-            r'\$\d+\.?\d*\s*cashback'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, all_text, re.IGNORECASE)
+        for pattern in self.FALLBACK_CASHBACK_PATTERNS:
+            match = pattern.search(all_text)
             if match:
                 return match.group()
         
@@ -426,17 +430,7 @@ class AdaptiveSelectorAgent(BaseAIAgent):
         if not text:
             return False
         
-        cashback_patterns = [
-            r'\d+\.?\d*%',
-            r'\$\d+',
-            r'points',
-            r'cashback',
-            r'cash back',
-            r'earn',
-            r'reward'
-        ]
-        
-        return any(re.search(pattern, text, re.IGNORECASE) for pattern in cashback_patterns)
+        return self.CASHBACK_INFO_RE.search(text) is not None
 
 
 class AIAgentOrchestrator:
@@ -60,6 +60,8 @@ class VisionBasedAgent(BaseAIAgent):
 class NLPEnhancedAgent(BaseAIAgent):
     """AI agent that uses NLP to understand content semantics"""
     
+    RATE_RE = re.compile(r'\d+\.?\d*%|\$\d+\.?\d*')
+    
     def __init__(self):
         super().__init__("NLP_Agent")
         try:
@@ -167,10 +169,7 @@ class NLPEnhancedAgent(BaseAIAgent):
         # Find the most relevant cashback sentence
         for sentence in cashback_sentences:
             # Look for percentage or dollar amounts
-            percentage_match = re.search(r'\d+\.?\d*%', sentence)
-            dollar_match = re.search(r'\$\d+\.?\d*', sentence)
-            
-            if percentage_match or dollar_match:
+            if self.RATE_RE.search(sentence):
                 return sentence
         
         # Fallback: return the first cashback sentence
@@ -213,6 +212,8 @@ class NLPEnhancedAgent(BaseAIAgent):
 class ContextAwareAgent(BaseAIAgent):
     """AI agent that uses context from previous scraping attempts"""
     
+    PERCENT_RE = re.compile(r'\d+\.?\d*%')
+    
     def __init__(self):
         super().__init__("Context_Aware")
         self.site_patterns = {}
@@ -291,7 +292,7 @@ class ContextAwareAgent(BaseAIAgent):
         merchant = h1.get_text().strip() if h1 else "Unknown"
         
         # Look for any element containing percentage
-        cashback_element = context.soup.find(text=re.compile(r'\d+\.?\d*%'))
+        cashback_element = context.soup.find(string=self.PERCENT_RE)
         cashback = cashback_element.strip() if cashback_element else "No Cashback Info"
         
         if merchant != "Unknown":
@@ -1,14 +1,43 @@
+import asyncio
+import aiohttp
+from aiolimiter import AsyncLimiter
 import requests
 import csv
+import gzip
+import orjson
+import os
 import time
 import logging
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional, Tuple
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+import soupsieve as sv
 from dataclasses import dataclass
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+try:
+    from aiohttp_client_cache import CachedSession, SQLiteBackend
+except ImportError:
+    CachedSession = None
+    SQLiteBackend = None
 
+# Sitemaps and merchant pages change at most daily; both response caches live in one git-ignored folder
+HTTP_CACHE_EXPIRE_AFTER = 86400
+HTTP_CACHE_DIR = '.http_cache'
 
-@dataclass
+# Bound parse work: merchant pages are well under this, sitemaps are capped by the protocol at 50MB
+MAX_PAGE_BYTES = 2_000_000
+MAX_SITEMAP_BYTES = 50_000_000
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+FETCH_CHUNK_SIZE = 65536
+
+
+@dataclass(slots=True)
 class CashbackOffer:
     """Data class for cashback offer information"""
     merchant: str
@@ -24,12 +53,36 @@ class CashbackOffer:
 class BaseCashbackScraper(ABC):
     """Abstract base class for cashback scrapers"""
     
+    # Only build tree nodes for the tags the extractors look at
+    PARSE_ONLY = SoupStrainer(["h1", "h3", "h4", "span", "div", "p", "title"])
+    
     def __init__(self, config: Dict):
         self.config = config
-        self.session = requests.Session()
+        if requests_cache:
+            # Persist responses on disk so re-runs skip unchanged sitemaps and pages
+            os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+            self.session = requests_cache.CachedSession(
+                os.path.join(HTTP_CACHE_DIR, f"{self.config['name']}_http_cache"),
+                expire_after=HTTP_CACHE_EXPIRE_AFTER,
+                allowable_codes=(200,),
+                stale_if_error=True
+            )
+        else:
+            self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Connection': 'keep-alive'
         })
+        
+        # Keep connections alive across requests and retry transient failures
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.setup_logging()
         
     def setup_logging(self):
@@ -47,11 +100,26 @@ class BaseCashbackScraper(ABC):
     def fetch_sitemap_urls(self) -> List[str]:
         """Fetch URLs from sitemap"""
         try:
-            response = self.session.get(self.config["sitemap_url"], timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, "xml")
-            urls = [loc.text for loc in soup.find_all("loc")]
+            with self.session.get(self.config["sitemap_url"], timeout=30, stream=True) as response:
+                response.raise_for_status()
+                if int(response.headers.get("content-length", 0)) > MAX_SITEMAP_BYTES:
+                    self.logger.error(f"Sitemap too large: {response.headers['content-length']} bytes")
+                    return []
+                response.raw.decode_content = True
+                source = response.raw
+                if self.config["sitemap_url"].endswith(".gz"):
+                    # Compressed sitemap file (not just a compressed transfer)
+                    source = gzip.GzipFile(fileobj=response.raw)
+                
+                # Stream <loc> entries instead of building the whole sitemap tree
+                urls = []
+                for _, loc in etree.iterparse(source, tag="{*}loc"):
+                    if loc.text:
+                        urls.append(loc.text.strip())
+                    loc.clear()
+                    entry = loc.getparent()
+                    while entry is not None and entry.getprevious() is not None:
+                        del entry.getparent()[0]
             
             self.logger.info(f"Found {len(urls)} URLs in sitemap")
             return urls
@@ -73,24 +141,89 @@ class BaseCashbackScraper(ABC):
         """Extract merchant data from page soup - must be implemented by subclasses"""
         pass
     
+    def parse_page(self, html: str, url: str) -> Optional[CashbackOffer]:
+        """Parse fetched page HTML and extract merchant data"""
+        soup = BeautifulSoup(html, "lxml", parse_only=self.PARSE_ONLY)
+        return self.extract_merchant_data(soup, url)
+    
     def scrape_page(self, url: str) -> Optional[CashbackOffer]:
         """Scrape a single page"""
         try:
-            response = self.session.get(url, timeout=10)
-            if response.status_code != 200:
-                self.logger.warning(f"Failed to load {url} - Status: {response.status_code}")
-                return None
+            with self.session.get(url, timeout=10, stream=True) as response:
+                if response.status_code != 200:
+                    self.logger.warning(f"Failed to load {url} - Status: {response.status_code}")
+                    return None
+                if not response.headers.get("content-type", "text/html").startswith(HTML_CONTENT_TYPES):
+                    self.logger.warning(f"Skipping non-HTML page {url}")
+                    return None
+                if int(response.headers.get("content-length", 0)) > MAX_PAGE_BYTES:
+                    self.logger.warning(f"Skipping oversized page {url}")
+                    return None
+                
+                body = bytearray()
+                for chunk in response.iter_content(FETCH_CHUNK_SIZE):
+                    body += chunk
+                    if len(body) > MAX_PAGE_BYTES:
+                        self.logger.warning(f"Skipping oversized page {url}")
+                        return None
+                html = body.decode(response.encoding or "utf-8", errors="replace")
                 
-            soup = BeautifulSoup(response.text, "html.parser")
-            return self.extract_merchant_data(soup, url)
+            return self.parse_page(html, url)
             
         except Exception as e:
             self.logger.error(f"Error scraping {url}: {e}")
             return None
     
-    def scrape_all(self, max_workers: int = 5) -> List[CashbackOffer]:
-        """Scrape all URLs with concurrent processing"""
-        urls = self.fetch_sitemap_urls()
+    async def _fetch(self, session: aiohttp.ClientSession, sem: asyncio.Semaphore,
+                     limiter: AsyncLimiter, url: str) -> Optional[CashbackOffer]:
+        """Fetch a single page within the concurrency and rate limits and parse it off the event loop"""
+        async with sem:
+            try:
+                async with limiter:
+                    async with session.get(url) as response:
+                        if response.status != 200:
+                            self.logger.warning(f"Failed to load {url} - Status: {response.status}")
+                            return None
+                        if "Content-Type" in response.headers and response.content_type not in HTML_CONTENT_TYPES:
+                            self.logger.warning(f"Skipping non-HTML page {url}")
+                            return None
+                        if (response.content_length or 0) > MAX_PAGE_BYTES:
+                            self.logger.warning(f"Skipping oversized page {url}")
+                            return None
+                        
+                        body = bytearray()
+                        async for chunk in response.content.iter_chunked(FETCH_CHUNK_SIZE):
+                            body += chunk
+                            if len(body) > MAX_PAGE_BYTES:
+                                self.logger.warning(f"Skipping oversized page {url}")
+                                return None
+                        html = body.decode(response.charset or "utf-8", errors="replace")
+            except Exception as e:
+                self.logger.error(f"Error scraping {url}: {e}")
+                return None
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.parse_page, html, url)
+    
+    def _make_connector(self, max_workers: int) -> aiohttp.TCPConnector:
+        """Build a pooled connector that resolves each host once per run"""
+        try:
+            resolver = aiohttp.AsyncResolver()
+        except RuntimeError:
+            # aiodns not installed - fall back to the default threaded resolver
+            resolver = None
+        return aiohttp.TCPConnector(
+            limit=max_workers,
+            limit_per_host=max_workers,
+            use_dns_cache=True,
+            ttl_dns_cache=3600,
+            resolver=resolver
+        )
+    
+    async def scrape_all_async(self, max_workers: int = 5) -> List[CashbackOffer]:
+        """Scrape all URLs concurrently over a single aiohttp session"""
+        loop = asyncio.get_running_loop()
+        urls = await loop.run_in_executor(None, self.fetch_sitemap_urls)
         if not urls:
             return []
             
@@ -99,31 +232,51 @@ class BaseCashbackScraper(ABC):
         
         self.logger.info(f"Starting to scrape {len(filtered_urls)} URLs with {max_workers} workers")
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            results = executor.map(self.scrape_page, filtered_urls)
-            
-            for result in results:
-                if result:
-                    offers.append(result)
-                    self.logger.info(f"Scraped: {result.merchant} - {result.cashback_offer}")
-                
-                # Rate limiting
-                time.sleep(self.config.get("delay", 1))
+        sem = asyncio.Semaphore(max_workers)
+        # Shared token bucket: at most max_workers requests per delay window across all workers
+        limiter = AsyncLimiter(max_workers, self.config.get("delay", 1))
+        connector = self._make_connector(max_workers)
+        timeout = aiohttp.ClientTimeout(total=10)
+        headers = {
+            'User-Agent': self.session.headers['User-Agent'],
+            'Accept-Encoding': self.session.headers['Accept-Encoding']
+        }
+        
+        if CachedSession:
+            os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+            cache = SQLiteBackend(
+                os.path.join(HTTP_CACHE_DIR, f"{self.config['name']}_http_cache_async"),
+                expire_after=HTTP_CACHE_EXPIRE_AFTER,
+                allowed_codes=(200,)
+            )
+            client_session = CachedSession(cache=cache, connector=connector, timeout=timeout, headers=headers)
+        else:
+            client_session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
+        
+        async with client_session as session:
+            results = await asyncio.gather(*(self._fetch(session, sem, limiter, url) for url in filtered_urls))
+        
+        for result in results:
+            if result:
+                offers.append(result)
+                self.logger.info(f"Scraped: {result.merchant} - {result.cashback_offer}")
         
         self.logger.info(f"Scraping complete! Found {len(offers)} valid offers")
         return offers
     
+    def scrape_all(self, max_workers: int = 5) -> List[CashbackOffer]:
+        """Scrape all URLs with concurrent processing"""
+        return asyncio.run(self.scrape_all_async(max_workers=max_workers))
+    
     def save_to_csv(self, offers: List[CashbackOffer], filename: str = None):
         """Save offers to CSV file"""
         if not filename:
             filename = f"{self.config['name']}_offers.csv"
             
-        with open(filename, "w", newline="", encoding="utf-8") as csvfile:
+        with open(filename, "w", newline="", encoding="utf-8", buffering=1 << 20) as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(["Merchant", "Cashback Offer", "URL", "Scraped At"])
-            
-            for offer in offers:
-                writer.writerow([offer.merchant, offer.cashback_offer, offer.url, offer.scraped_at])
+            writer.writerows((offer.merchant, offer.cashback_offer, offer.url, offer.scraped_at) for offer in offers)
         
         self.logger.info(f"Data saved to {filename}")
     
@@ -132,18 +285,9 @@ class BaseCashbackScraper(ABC):
         if not filename:
             filename = f"{self.config['name']}_offers.json"
             
-        data = [
-            {
-                "merchant": offer.merchant,
-                "cashback_offer": offer.cashback_offer,
-                "url": offer.url,
-                "scraped_at": offer.scraped_at
-            }
-            for offer in offers
-        ]
-        
-        with open(filename, "w", encoding="utf-8") as jsonfile:
-            json.dump(data, jsonfile, indent=2, ensure_ascii=False)
+        # orjson serializes the CashbackOffer dataclasses directly
+        with open(filename, "wb") as jsonfile:
+            jsonfile.write(orjson.dumps(offers, option=orjson.OPT_INDENT_2))
         
         self.logger.info(f"Data saved to {filename}")
 
@@ -151,6 +295,10 @@ class BaseCashbackScraper(ABC):
 class ShopBackScraper(BaseCashbackScraper):
     """Scraper for ShopBack website"""
     
+    # Compiled once; fallbacks are matched in a single DOM walk
+    CASHBACK_SELECTOR = sv.compile("h4.fs_sbds-global-font-size-7")
+    FALLBACK_SELECTOR = sv.compile("span.cashback-rate, div.rate, p.cashback-percentage")
+    
     def extract_merchant_data(self, soup: BeautifulSoup, url: str) -> Optional[CashbackOffer]:
         """Extract merchant data from ShopBack page"""
         try:
@@ -158,27 +306,13 @@ class ShopBackScraper(BaseCashbackScraper):
             merchant_element = soup.find("h1")
             if not merchant_element:
                 return None
-            merchant_name = merchant_element.text.strip()
+            merchant_name = merchant_element.get_text(" ", strip=True)
             
-            # Extract cashback offer
+            # Extract cashback offer, trying alternative selectors if primary fails
             cashback_offer = "No Cashback Info"
-            cashback_element = soup.find("h4", class_="fs_sbds-global-font-size-7")
+            cashback_element = self.CASHBACK_SELECTOR.select_one(soup) or self.FALLBACK_SELECTOR.select_one(soup)
             if cashback_element:
-                cashback_offer = cashback_element.text.strip()
-            
-            # Additional selectors to try if primary fails
-            if cashback_offer == "No Cashback Info":
-                alternative_selectors = [
-                    {"tag": "span", "class": "cashback-rate"},
-                    {"tag": "div", "class": "rate"},
-                    {"tag": "p", "class": "cashback-percentage"}
-                ]
-                
-                for selector in alternative_selectors:
-                    element = soup.find(selector["tag"], class_=selector["class"])
-                    if element:
-                        cashback_offer = element.text.strip()
-                        break
+                cashback_offer = cashback_element.get_text(" ", strip=True)
             
             return CashbackOffer(
                 merchant=merchant_name,
@@ -194,6 +328,10 @@ class ShopBackScraper(BaseCashbackScraper):
 class CashRewardsScraper(BaseCashbackScraper):
     """Scraper for CashRewards website"""
     
+    # Compiled once; fallbacks are matched in a single DOM walk
+    CASHBACK_SELECTOR = sv.compile('h3[data-test-id="cashback-rate"]')
+    FALLBACK_SELECTOR = sv.compile('span.cashback-rate, div.rate-display, p[data-test="rate"]')
+    
     def extract_merchant_data(self, soup: BeautifulSoup, url: str) -> Optional[CashbackOffer]:
         """Extract merchant data from CashRewards page"""
         try:
@@ -201,31 +339,17 @@ class CashRewardsScraper(BaseCashbackScraper):
             merchant_element = soup.find("h1")
             if not merchant_element:
                 return None
-            merchant_name = merchant_element.text.strip()
+            merchant_name = merchant_element.get_text(" ", strip=True)
             
             # Skip if merchant name is unknown
             if merchant_name.lower() in ["unknown", ""]:
                 return None
             
-            # Extract cashback offer
+            # Extract cashback offer, trying alternative selectors if primary fails
             cashback_offer = "No Cashback Info"
-            cashback_element = soup.find("h3", {"data-test-id": "cashback-rate"})
+            cashback_element = self.CASHBACK_SELECTOR.select_one(soup) or self.FALLBACK_SELECTOR.select_one(soup)
             if cashback_element:
-                cashback_offer = cashback_element.text.strip()
-            
-            # Additional selectors to try if primary fails
-            if cashback_offer == "No Cashback Info":
-                alternative_selectors = [
-                    {"tag": "span", "attrs": {"class": "cashback-rate"}},
-                    {"tag": "div", "attrs": {"class": "rate-display"}},
-                    {"tag": "p", "attrs": {"data-test": "rate"}}
-                ]
-                
-                for selector in alternative_selectors:
-                    element = soup.find(selector["tag"], selector["attrs"])
-                    if element:
-                        cashback_offer = element.text.strip()
-                        break
+                cashback_offer = cashback_element.get_text(" ", strip=True)
             
             return CashbackOffer(
                 merchant=merchant_name,
@@ -263,7 +387,8 @@ class CashbackScraperFactory:
         if scraper_type not in cls.SCRAPER_CONFIGS:
             raise ValueError(f"Unknown scraper type: {scraper_type}")
         
-        config = cls.SCRAPER_CONFIGS[scraper_type]
+        # Copy so the class-level config survives repeated (and concurrent) creation
+        config = dict(cls.SCRAPER_CONFIGS[scraper_type])
         scraper_class = config.pop("scraper_class")
         return scraper_class(config)
     
@@ -286,40 +411,55 @@ class CashbackAggregator:
         self.results[scraper_type] = offers
         return offers
     
-    def run_all_scrapers(self, max_workers: int = 5) -> Dict[str, List[CashbackOffer]]:
-        """Run all available scrapers"""
+    async def run_scraper_async(self, scraper_type: str, max_workers: int = 5) -> List[CashbackOffer]:
+        """Run a specific scraper on the current event loop"""
+        print(f"Running {scraper_type} scraper...")
+        scraper = CashbackScraperFactory.create_scraper(scraper_type)
+        return await scraper.scrape_all_async(max_workers=max_workers)
+    
+    async def run_all_scrapers_async(self, max_workers: int = 5) -> Dict[str, List[CashbackOffer]]:
+        """Run all available scrapers concurrently, each against its own host"""
         available_scrapers = CashbackScraperFactory.get_available_scrapers()
         
-        for scraper_type in available_scrapers:
-            print(f"\n{'='*50}")
-            print(f"Running {scraper_type} scraper...")
-            print(f"{'='*50}")
-            self.run_scraper(scraper_type, max_workers)
+        print(f"\n{'='*50}")
+        print(f"Running {len(available_scrapers)} scrapers concurrently...")
+        print(f"{'='*50}")
+        
+        all_offers = await asyncio.gather(
+            *(self.run_scraper_async(scraper_type, max_workers) for scraper_type in available_scrapers)
+        )
         
+        # Assign after gather so results are never mutated mid-run
+        self.results.update(zip(available_scrapers, all_offers))
         return self.results
     
+    def run_all_scrapers(self, max_workers: int = 5) -> Dict[str, List[CashbackOffer]]:
+        """Run all available scrapers"""
+        return asyncio.run(self.run_all_scrapers_async(max_workers))
+    
     def combine_and_save(self, filename: str = "combined_cashback_offers"):
         """Combine all results and save to files"""
-        all_offers = []
-        
-        for scraper_type, offers in self.results.items():
-            for offer in offers:
-                offer_dict = {
-                    "source": scraper_type,
-                    "merchant": offer.merchant,
-                    "cashback_offer": offer.cashback_offer,
-                    "url": offer.url,
-                    "scraped_at": offer.scraped_at
-                }
-                all_offers.append(offer_dict)
+        all_offers = [
+            {
+                "source": scraper_type,
+                "merchant": offer.merchant,
+                "cashback_offer": offer.cashback_offer,
+                "url": offer.url,
+                "scraped_at": offer.scraped_at
+            }
+            for scraper_type, offers in self.results.items()
+            for offer in offers
+        ]
         
-        # Save to CSV
-        df = pd.DataFrame(all_offers)
-        df.to_csv(f"{filename}.csv", index=False)
+        # Write CSV rows directly, no DataFrame round-trip needed
+        with open(f"{filename}.csv", "w", newline="", encoding="utf-8", buffering=1 << 20) as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=["source", "merchant", "cashback_offer", "url", "scraped_at"])
+            writer.writeheader()
+            writer.writerows(all_offers)
         
         # Save to JSON
-        with open(f"{filename}.json", "w", encoding="utf-8") as f:
-            json.dump(all_offers, f, indent=2, ensure_ascii=False)
+        with open(f"{filename}.json", "wb") as f:
+            f.write(orjson.dumps(all_offers, option=orjson.OPT_INDENT_2))
         
         print(f"\nCombined {len(all_offers)} offers from {len(self.results)} sources")
         print(f"Results saved to {filename}.csv and {filename}.json")
@@ -331,10 +471,18 @@ class CashbackAggregator:
         summary = {}
         
         for scraper_type, offers in self.results.items():
+            # Single pass over the offers for all three metrics
+            with_cashback = 0
+            merchants = set()
+            for offer in offers:
+                if offer.cashback_offer != "No Cashback Info":
+                    with_cashback += 1
+                merchants.add(offer.merchant)
+            
             summary[scraper_type] = {
                 "total_offers": len(offers),
-                "merchants_with_cashback": len([o for o in offers if o.cashback_offer != "No Cashback Info"]),
-                "unique_merchants": len(set(o.merchant for o in offers))
+                "merchants_with_cashback": with_cashback,
+                "unique_merchants": len(merchants)
             }
         
         return summary
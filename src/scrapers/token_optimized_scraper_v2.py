@@ -4,41 +4,672 @@ Token-Optimized AI Scraper with Intelligence Levels
 ===================================================
 
 Enhanced version with multiple intelligence levels:
-- Basic: Simple cashback extraction (GPT-3.5-turbo)
-- Standard: Business insights and recommendations (GPT-3.5-turbo)
+- Basic: Simple cashback extraction (GPT-4o mini)
+- Standard: Business insights and recommendations (GPT-4o mini)
 - Comprehensive: Full business intelligence analysis (GPT-4o)
 
 The comprehensive level automatically uses GPT-4o for superior analysis quality.
 """
 
+import argparse
+import asyncio
+import aiohttp
+import httpx
+from aiolimiter import AsyncLimiter
 import requests
+from requests.adapters import HTTPAdapter
 import csv
+import gzip
 import json
-import time
+import orjson
 import logging
-from bs4 import BeautifulSoup
+import logging.handlers
+import atexit
+import queue
+from lxml import etree, html as lxml_html
 from dotenv import load_dotenv
 import openai
 import os
 import re
+import hashlib
 import tiktoken
 from datetime import datetime
+from collections import defaultdict
+from functools import cached_property, lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import itemgetter
+from urllib.parse import urlparse
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+try:
+    import faiss
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    faiss = SentenceTransformer = None
+try:
+    import h2  # enables HTTP/2 in httpx
+except ImportError:
+    h2 = None
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:
+    MinHash = MinHashLSH = None
 
 # Load environment variables
 load_dotenv()
 
+# Percentage and dollar rates with bounded surrounding context (unbounded [^.]* backtracks badly on long pages)
+_RATE_RE = re.compile(r'[^.\n]{0,80}(?:\d+\.?\d*%|\$\d+(?:\.\d+)?)[^.\n]{0,80}')
+
+# A single rate value ("7.5%", "$10"), for telling one-offer pages from multi-offer ones
+_RATE_VALUE_RE = re.compile(r'\d+(?:\.\d+)?%|\$\d+(?:\.\d+)?')
+
+# Cashback-related keywords as one alternation so each text node is scanned once
+_CASHBACK_KEYWORD_RE = re.compile(r'cashback|cash back|reward|earn|%|discount|offer|deal', re.I)
+
+# Unambiguous cashback rate statements, e.g. "Up to 7.5% Cashback" or "$10 cash back"
+_OBVIOUS_CASHBACK_RE = re.compile(r'(?:up to\s+)?(?:\d+(?:\.\d+)?%|\$\d+(?:\.\d+)?)\s*cash\s?back', re.I)
+
+# Sitemap URLs containing any of these commonly fail or are not merchant pages; matched as one alternation
+SKIP_URL_PATTERNS = (
+    '/notfound', '/error', '/404', '/maintenance',
+    '.xml', '.css', '.js', '.pdf', '.jpg', '.png', '.gif',
+    '/api/', '/admin/', '/login', '/logout', '/search?', '/category/', '/tag/', '/page/',
+    'javascript:', 'mailto:', 'tel:', '#'
+)
+_SKIP_URL_RE = re.compile('|'.join(map(re.escape, SKIP_URL_PATTERNS)), re.I)
+
+# Soft error pages (served with status 200) announce themselves near the top of the document
+ERROR_PAGE_INDICATORS = (
+    '404', 'not found', 'page not found', 'error occurred', 'access denied',
+    'store unavailable', 'not available', 'no longer available', 'currently unavailable',
+    'this store is not available', 'store not found', 'shop unavailable', 'shop not found',
+    'no longer exists', 'no longer active', 'inactive store', 'inactive shop', 'closed store', 'closed shop'
+)
+_ERROR_PAGE_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, ERROR_PAGE_INDICATORS)) + r')\b', re.I)
+ERROR_PROBE_CHARS = 8192
+
+_TEXT_NODES_XPATH = etree.XPath('//text()')
+_H1_XPATH = etree.XPath('//h1')
+
+# Optimized content keeps at most this many sections (title, keyword context, rates)
+MAX_CONTENT_SECTIONS = 12
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _class_xpath(tag, class_name):
+    """Compile the XPath equivalent of the CSS selector tag.class_name"""
+    return etree.XPath(f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]")
+
+
+def _visible_text(tree):
+    """Text of the page body (or the whole tree or element when there is none), capped for regex scans"""
+    body = tree.find('.//body')
+    # Join text nodes only up to the cap instead of materializing the whole document's text
+    parts = []
+    size = 0
+    for text in (body if body is not None else tree).itertext():
+        parts.append(text)
+        size += len(text)
+        if size >= MAX_SCAN_CHARS:
+            break
+    return "".join(parts)[:MAX_SCAN_CHARS]
+
+
+def _offer_scope(tree, heading):
+    """Part of the page that holds its own offer: <main>, else the heading's article or section, else everything"""
+    main = tree.find('.//main')
+    if main is not None:
+        return main
+    return next(heading.iterancestors('article', 'section'), tree)
+
+
+def _canonical_url(url):
+    """Host and path, case-folded and without a trailing slash, so variants of one page compare equal"""
+    parts = urlparse(url)
+    return parts.netloc.lower(), parts.path.rstrip('/').lower()
+
+
+def _rate_sections(tree, limit=3):
+    """First few rate statements, scanning text nodes in document order instead of the joined page text"""
+    body = tree.find('.//body')
+    sections = []
+    for text in (body if body is not None else tree).itertext():
+        if '%' not in text and '$' not in text:
+            continue
+        for match in _RATE_RE.finditer(text):
+            sections.append(f"RATE: {match.group().strip()}")
+            if len(sections) >= limit:
+                return sections
+    return sections
+
+
+def _extract_json(text):
+    """First JSON object in an AI reply, ignoring any prose around it (None if there is none)"""
+    try:
+        # Structured outputs and JSON mode reply with bare JSON
+        data = orjson.loads(text)
+        if isinstance(data, dict):
+            return data
+    except orjson.JSONDecodeError:
+        pass
+    
+    # Replies wrapped in a code fence or a sentence: the outermost braces are usually the object
+    start, end = text.find('{'), text.rfind('}')
+    if start != -1 and end > start:
+        try:
+            data = orjson.loads(text[start:end + 1])
+            if isinstance(data, dict):
+                return data
+        except orjson.JSONDecodeError:
+            pass
+    
+    while start != -1:
+        try:
+            data, _ = _JSON_DECODER.raw_decode(text, start)
+            if isinstance(data, dict):
+                return data
+        except json.JSONDecodeError:
+            pass
+        start = text.find('{', start + 1)
+    return None
+
+
+def _parse_html(html_content):
+    """Parse page HTML with lxml, or return None if there is nothing to parse"""
+    try:
+        try:
+            return lxml_html.fromstring(html_content)
+        except ValueError:
+            # lxml rejects str input that carries an XML encoding declaration
+            return lxml_html.fromstring(html_content.encode('utf-8'))
+    except etree.ParserError:
+        return None
+
+
+# Shared BPE encoding (gpt-4o family; close enough for gpt-3.5-turbo estimates), loaded once per process.
+# tiktoken downloads the BPE file into a temp dir by default; keep it somewhere that survives reboots
+os.environ.setdefault("TIKTOKEN_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "tiktoken"))
+try:
+    _ENC = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENC = None
+
+# Models that accept strict json_schema response formats; others fall back to JSON mode
+STRUCTURED_OUTPUT_MODELS = {"gpt-4o-mini", "gpt-4o"}
+
+
+def _strict_object(properties):
+    """Object schema in the shape strict structured outputs require (every key required, no extras)"""
+    return {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+
+
+def _enum(*values):
+    return {"type": "string", "enum": list(values)}
+
+
+_STRING = {"type": "string"}
+_STRING_LIST = {"type": "array", "items": _STRING}
+_LEVEL = _enum("high", "medium", "low")
+
+_BASIC_RESULT_PROPERTIES = {
+    "merchant_name": {"type": ["string", "null"]},
+    "cashback_offer": {"type": ["string", "null"]},
+    "confidence": {"type": "number"},
+    "competitive_threat": {"type": "string", "enum": ["high", "medium", "low"]}
+}
+
+BASIC_RESULT_SCHEMA = _strict_object(_BASIC_RESULT_PROPERTIES)
+
+BASIC_BATCH_SCHEMA = _strict_object({
+    "results": {"type": "array", "items": _strict_object({"index": {"type": "integer"}, **_BASIC_RESULT_PROPERTIES})}
+})
+
+STANDARD_RESULT_SCHEMA = _strict_object({
+    "basic_info": _strict_object({
+        "merchant_name": _STRING,
+        "cashback_offer": _STRING,
+        "offer_type": _enum("percentage", "fixed")
+    }),
+    "competitive_intelligence": _strict_object({
+        "threat_level": _LEVEL,
+        "market_position": _enum("premium", "mid_market", "budget"),
+        "pokitpal_opportunity": _LEVEL
+    }),
+    "user_experience": _strict_object({
+        "ease_of_use": _enum("excellent", "good", "average", "poor"),
+        "mobile_optimized": {"type": "boolean"}
+    }),
+    "pokitpal_recommendations": _STRING_LIST,
+    "confidence": {"type": "number"}
+})
+
+STANDARD_BATCH_SCHEMA = _strict_object({
+    "results": {"type": "array", "items": _strict_object({"index": {"type": "integer"}, **STANDARD_RESULT_SCHEMA["properties"]})}
+})
+
+COMPREHENSIVE_RESULT_SCHEMA = _strict_object({
+    "basic_info": _strict_object({"merchant_name": _STRING, "cashback_offer": _STRING, "offer_type": _STRING}),
+    "competitive_positioning": _strict_object({
+        "market_position": _STRING,
+        "unique_selling_points": _STRING_LIST,
+        "competitive_advantages": _STRING_LIST,
+        "weaknesses_pokitpal_can_exploit": _STRING_LIST
+    }),
+    "offer_intelligence": _strict_object({
+        "offer_attractiveness": _STRING,
+        "offer_complexity": _STRING,
+        "pokitpal_differentiation_opportunity": _LEVEL,
+        "special_conditions": _STRING_LIST,
+        "exclusions": _STRING_LIST
+    }),
+    "user_experience": _strict_object({
+        "ease_of_use": _STRING,
+        "signup_process": _STRING,
+        "payment_methods": _STRING_LIST,
+        "mobile_optimized": {"type": "boolean"},
+        "pokitpal_ux_advantages": _STRING_LIST
+    }),
+    "strategic_insights": _strict_object({
+        "threat_to_pokitpal": _STRING,
+        "partnership_opportunity": _STRING,
+        "market_share_vulnerability": _STRING,
+        "customer_acquisition_difficulty": _STRING
+    }),
+    "pokitpal_strategic_recommendations": _STRING_LIST,
+    "competitive_summary": _strict_object({
+        "overall_threat_level": _LEVEL,
+        "pokitpal_response_priority": _enum("urgent", "high", "medium", "low"),
+        "recommended_pokitpal_strategy": _enum("compete_directly", "differentiate", "avoid", "partner")
+    }),
+    "data_quality": _strict_object({
+        "extraction_confidence": {"type": "number"},
+        "data_completeness": {"type": "number"},
+        "analysis_reliability": {"type": "number"}
+    })
+})
+
+# Response schema name and schema per intelligence level
+RESULT_SCHEMAS = {
+    "basic": ("cashback_offer", BASIC_RESULT_SCHEMA),
+    "standard": ("competitive_intelligence", STANDARD_RESULT_SCHEMA),
+    "comprehensive": ("competitive_analysis", COMPREHENSIVE_RESULT_SCHEMA)
+}
+
+# Results, summaries and batch state are written here (created once, when the scraper starts)
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
+
+# Cached AI extractions are reused for 30 days
+LLM_CACHE_EXPIRE = 30 * 86400
+
+# Optimized content and token counts of pages already seen, keyed by page hash (safe to evict)
+CONTENT_CACHE_SIZE_LIMIT = 64 * 1024 * 1024
+
+# Sitemap URL lists change slowly, so repeated runs reuse them for 6 hours
+SITEMAP_CACHE_EXPIRE = 6 * 3600
+
+# Near-duplicate pages above this cosine similarity reuse an earlier analysis (merchant and rate are always re-extracted)
+SEMANTIC_CACHE_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SEMANTIC_CACHE_THRESHOLD = 0.9
+
+# Pages this similar (Jaccard over word shingles) to an analysed page reuse its analysis with a basic call
+TEMPLATE_SIMILARITY_THRESHOLD = 0.85
+TEMPLATE_NUM_PERM = 64
+
+# Batch API requests are billed at half the synchronous token price
+BATCH_API_DISCOUNT = 0.5
+
+# Basic pages this short with a single rate value are sent to the cheapest model whatever was requested
+SIMPLE_PAGE_TOKENS = 500
+SIMPLE_PAGE_MODEL = "gpt-4o-mini"
+
+# Prompt prefixes OpenAI has cached (1024+ identical leading tokens) bill their input at half price
+CACHED_INPUT_DISCOUNT = 0.5
+
+# Optimized content beyond this many characters would be trimmed anyway
+MAX_OPTIMIZED_CHARS = 8000
+
+# Rate signals sit near the top of the page body; never regex-scan more than this
+MAX_SCAN_CHARS = 50_000
+
+# Flattened competitive intelligence columns shared by every CSV export
+COMPREHENSIVE_FIELDNAMES = [
+    'merchant_name', 'cashback_offer', 'offer_type',
+    'market_position', 'unique_selling_points', 'competitive_advantages', 'weaknesses_pokitpal_can_exploit',
+    'offer_attractiveness', 'offer_complexity', 'pokitpal_differentiation_opportunity',
+    'special_conditions', 'exclusions',
+    'ease_of_use', 'signup_process', 'payment_methods', 'mobile_optimized', 'pokitpal_ux_advantages',
+    'threat_to_pokitpal', 'partnership_opportunity', 'market_share_vulnerability', 'customer_acquisition_difficulty',
+    'pokitpal_recommendation_1', 'pokitpal_recommendation_2', 'pokitpal_recommendation_3',
+    'overall_threat_level', 'pokitpal_response_priority', 'recommended_pokitpal_strategy',
+    'extraction_confidence', 'data_completeness', 'analysis_reliability',
+    'tokens_used', 'cost', 'url', 'scraped_at'
+]
+
+# Comprehensive CSV columns per result section: (section, plain columns, list columns joined with '; ')
+COMPREHENSIVE_SECTION_COLUMNS = (
+    ('basic_info', ('merchant_name', 'cashback_offer', 'offer_type'), ()),
+    ('competitive_positioning', ('market_position',),
+     ('unique_selling_points', 'competitive_advantages', 'weaknesses_pokitpal_can_exploit')),
+    ('offer_intelligence', ('offer_attractiveness', 'offer_complexity', 'pokitpal_differentiation_opportunity'),
+     ('special_conditions', 'exclusions')),
+    ('user_experience', ('ease_of_use', 'signup_process', 'mobile_optimized'),
+     ('payment_methods', 'pokitpal_ux_advantages')),
+    ('strategic_insights', ('threat_to_pokitpal', 'partnership_opportunity',
+                            'market_share_vulnerability', 'customer_acquisition_difficulty'), ()),
+    ('competitive_summary', ('overall_threat_level', 'pokitpal_response_priority', 'recommended_pokitpal_strategy'), ()),
+)
+RECOMMENDATION_COLUMNS = ('pokitpal_recommendation_1', 'pokitpal_recommendation_2', 'pokitpal_recommendation_3')
+_EMPTY = {}
+_join = '; '.join
+
+# Trailing CSV columns copied verbatim from a comprehensive result's data_quality and extraction_metadata
+DATA_QUALITY_FIELDS = ('extraction_confidence', 'data_completeness', 'analysis_reliability')
+METADATA_FIELDS = ('tokens_used', 'cost', 'url', 'scraped_at')
+_DATA_QUALITY_GETTER = itemgetter(*DATA_QUALITY_FIELDS)
+_METADATA_GETTER = itemgetter(*METADATA_FIELDS)
+
+
+def _section_values(getter, fields, section):
+    """Values of fields from a result section, '' for missing ones (one itemgetter call when all are present)"""
+    try:
+        return getter(section)
+    except KeyError:
+        return tuple(section.get(field, '') for field in fields)
+
+
+# Basic and standard results are already flat; their CSV rows are the result dicts themselves
+RESULT_FIELDNAMES = {
+    "basic": [
+        'merchant', 'cashback_offer', 'competitive_threat', 'confidence',
+        'method', 'tokens_used', 'cost', 'url', 'scraped_at'
+    ],
+    "standard": [
+        'merchant', 'cashback_offer', 'offer_type',
+        'competitive_threat_level', 'market_position', 'pokitpal_opportunity',
+        'ease_of_use', 'mobile_optimized', 'pokitpal_strategic_recommendations', 'confidence',
+        'method', 'tokens_used', 'cost', 'url', 'scraped_at'
+    ]
+}
+
+# Only the start of a merchant page is downloaded; merchant and rate details sit well above this
+PAGE_READ_LIMIT = 512 * 1024
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Statuses servers answer HEAD with when they only serve GET
+HEAD_REJECTED_STATUSES = (403, 405)
+
+# Transient statuses worth another attempt; any other error status fails the page immediately
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+@lru_cache(maxsize=256)
+def _cached_token_count(text):
+    """Exact token count for short strings that recur on every page (system messages, prompt templates)"""
+    return len(_ENC.encode(text, disallowed_special=()))
+
+
+def should_retry(status):
+    """Whether a failed page fetch with this HTTP status may succeed on retry"""
+    return status in RETRYABLE_STATUSES
+
+
+def fast_token_estimate(text):
+    """Cheap token estimate (BPE encodings average 3-4 characters per token on page text)"""
+    return (len(text) + 2) // 3
+
+
+def optimize_html_content(html_content, max_input_tokens):
+    """Optimize HTML content to minimize tokens while preserving important info (picklable for process pools)"""
+    tree = _parse_html(html_content)
+    if tree is None:
+        return "", 0
+    
+    # Remove unnecessary elements (keeping the text that follows them)
+    etree.strip_elements(tree, 'script', 'style', 'nav', 'footer', 'header', 'aside', with_tail=False)
+    
+    # Look for percentage and dollar amounts first - strong matches make the keyword scan unnecessary
+    rate_sections = _rate_sections(tree)
+    
+    relevant_sections = []
+    seen_sections = set()  # Neighbouring nodes often share a parent; send each section once
+    keyword_hits = {}
+    
+    # 1. Look for cashback-related keywords in a single pass over the text nodes
+    for text_node in (_TEXT_NODES_XPATH(tree) if len(rate_sections) < 3 else ()):
+        match = _CASHBACK_KEYWORD_RE.search(text_node)
+        if not match:
+            continue
+        keyword = match.group().lower()
+        if keyword_hits.get(keyword, 0) >= 2:  # Limit to first 2 matches per keyword
+            continue
+        
+        parent = text_node.getparent()
+        if text_node.is_tail:
+            parent = parent.getparent()
+        if parent is not None:
+            text = parent.text_content().strip()
+            if text and len(text) < 200 and text.lower() not in seen_sections:  # Keep sections under 200 chars
+                seen_sections.add(text.lower())
+                relevant_sections.append(text)
+                keyword_hits[keyword] = keyword_hits.get(keyword, 0) + 1
+                if len(relevant_sections) >= MAX_CONTENT_SECTIONS:  # Anything further is cut below
+                    break
+    
+    # 2. Get title and main content
+    title = tree.findtext('.//title')
+    if title:
+        relevant_sections.insert(0, f"TITLE: {title.strip()}")
+    
+    # 3. Percentage and dollar amounts found above
+    relevant_sections.extend(rate_sections)
+    
+    # Combine and optimize
+    optimized_content = "\n".join(relevant_sections[:MAX_CONTENT_SECTIONS])[:MAX_OPTIMIZED_CHARS]  # Limit sections
+    
+    # Well under budget: skip tokenizing, the estimate is good enough for batching and logs
+    estimate = fast_token_estimate(optimized_content)
+    if estimate <= 0.9 * max_input_tokens:
+        return optimized_content, estimate
+    
+    # Trim if too long - by exact token count when the tokenizer is available
+    if _ENC:
+        tokens = _ENC.encode(optimized_content, disallowed_special=())
+        if len(tokens) > max_input_tokens:
+            tokens = tokens[:max_input_tokens]
+            optimized_content = _ENC.decode(tokens)
+        return optimized_content, len(tokens)
+    
+    words = optimized_content.split()
+    if len(words) * 1.3 > max_input_tokens:
+        words = words[:int(max_input_tokens * 0.75)]
+        optimized_content = " ".join(words)
+    
+    return optimized_content, len(words) * 1.3
+
+
+class SemanticResultCache:
+    """Embedding index of optimized page content, one per model and intelligence level"""
+    
+    def __init__(self, directory, threshold=SEMANTIC_CACHE_THRESHOLD):
+        self.directory = directory
+        self.threshold = threshold
+        self._entries = {}  # (model, level) -> (faiss index, results in index order)
+        self._dirty = set()
+    
+    @cached_property
+    def encoder(self):
+        return SentenceTransformer(SEMANTIC_CACHE_MODEL)
+    
+    def embed(self, content):
+        """Unit-length embedding, so inner product is cosine similarity"""
+        return self.encoder.encode([content], normalize_embeddings=True).astype('float32')
+    
+    def _paths(self, key):
+        base = os.path.join(self.directory, '-'.join(key))
+        return f"{base}.faiss", f"{base}.json"
+    
+    def _entry(self, key):
+        if key not in self._entries:
+            index_path, payload_path = self._paths(key)
+            if os.path.exists(index_path) and os.path.exists(payload_path):
+                with open(payload_path, 'rb') as f:
+                    self._entries[key] = (faiss.read_index(index_path), orjson.loads(f.read()))
+            else:
+                self._entries[key] = (faiss.IndexFlatIP(self.encoder.get_sentence_embedding_dimension()), [])
+        return self._entries[key]
+    
+    def lookup(self, key, vector):
+        """Stored result for the most similar earlier page, or None below the threshold"""
+        index, results = self._entry(key)
+        if index.ntotal == 0:
+            return None
+        scores, ids = index.search(vector, 1)
+        return results[ids[0][0]] if scores[0][0] >= self.threshold else None
+    
+    def add(self, key, vector, result):
+        index, results = self._entry(key)
+        index.add(vector)
+        results.append(result)
+        self._dirty.add(key)
+    
+    def save(self):
+        """Write changed indexes and their results to disk"""
+        os.makedirs(self.directory, exist_ok=True)
+        for key in self._dirty:
+            index, results = self._entries[key]
+            index_path, payload_path = self._paths(key)
+            faiss.write_index(index, index_path)
+            with open(payload_path, 'wb') as f:
+                f.write(orjson.dumps(results))
+        self._dirty.clear()
+
+
 class TokenOptimizedAIScraper:
     """AI-enhanced scraper with intelligent token management and multiple intelligence levels"""
     
+    # Sitemap and home page of each supported site
+    SITES = {
+        "shopback": ("https://www.shopback.com.au/sitemap.xml", "https://www.shopback.com.au"),
+        "cashrewards": ("https://www.cashrewards.com.au/en/sitemap.xml", "https://www.cashrewards.com.au")
+    }
+    
+    # Known page layouts: (merchant selector, cashback selectors in priority order)
+    # Compiled once; only the current host's rules are evaluated
+    SITE_RULES = {
+        "shopback.com.au": (_H1_XPATH, (
+            _class_xpath("h4", "fs_sbds-global-font-size-7"),
+            _class_xpath("span", "cashback-rate"),
+            _class_xpath("div", "rate"),
+            _class_xpath("p", "cashback-percentage")
+        )),
+        "cashrewards.com.au": (_H1_XPATH, (
+            etree.XPath('//h3[@data-test-id="cashback-rate"]'),
+            _class_xpath("span", "cashback-rate"),
+            _class_xpath("div", "rate-display"),
+            etree.XPath('//p[@data-test="rate"]')
+        ))
+    }
+    
+    # Static prompt parts, identical on every call so the API's prompt-prefix cache can hit
+    SYSTEM_MESSAGES = {
+        "basic": "You are a competitive intelligence analyst for Pokitpal (a cashback platform). Extract competitor data and assess competitive threats. Return only valid JSON.",
+        "standard": "You are a competitive intelligence analyst for Pokitpal. Analyze competitor cashback platforms to identify threats, opportunities, and strategic recommendations for Pokitpal's competitive advantage.",
+        "comprehensive": "You are a senior competitive intelligence analyst for Pokitpal, a cashback/rewards platform. Provide detailed competitive analysis to help Pokitpal strategically position against competitors, identify market gaps, and develop winning strategies."
+    }
+    
+    COMPETITIVE_CONTEXT = """
+CONTEXT: This analysis is for Pokitpal, a cashback/rewards platform. Analyze these competitor cashback merchants to understand:
+- How they position their offers vs Pokitpal's potential offerings
+- Market gaps Pokitpal could exploit
+- Competitive threats and opportunities
+- Strategic recommendations for Pokitpal's competitive positioning
+"""
+    
+    PROMPT_TEMPLATES = {
+        "basic": COMPETITIVE_CONTEXT + """
+
+Extract competitor cashback data from the webpage content below.
+
+Return only JSON:
+{"merchant_name": "name or null", "cashback_offer": "offer or null", "confidence": 0.9, "competitive_threat": "high|medium|low"}""",
+        "standard": COMPETITIVE_CONTEXT + """
+
+Analyze the competitor cashback merchant page below for Pokitpal's strategic planning.
+
+Return JSON with competitive intelligence:
+{"basic_info": {"merchant_name": "name", "cashback_offer": "rate", "offer_type": "percentage|fixed"}, 
+"competitive_intelligence": {"threat_level": "high|medium|low", "market_position": "premium|mid_market|budget", "pokitpal_opportunity": "high|medium|low"},
+"user_experience": {"ease_of_use": "excellent|good|average|poor", "mobile_optimized": true|false},
+"pokitpal_recommendations": ["competitive_rec1", "competitive_rec2"],
+"confidence": 0.9}""",
+        "comprehensive": COMPETITIVE_CONTEXT + """
+
+Provide comprehensive competitive intelligence analysis of the cashback merchant below for Pokitpal's strategic advantage.
+
+Return detailed competitive analysis JSON:
+{"basic_info": {"merchant_name": "name", "cashback_offer": "rate", "offer_type": "type"},
+"competitive_positioning": {"market_position": "position", "unique_selling_points": ["point1"], "competitive_advantages": ["adv1"], "weaknesses_pokitpal_can_exploit": ["weakness1"]},
+"offer_intelligence": {"offer_attractiveness": "level", "offer_complexity": "level", "pokitpal_differentiation_opportunity": "high|medium|low", "special_conditions": ["cond1"], "exclusions": ["excl1"]},
+"user_experience": {"ease_of_use": "level", "signup_process": "complexity", "payment_methods": ["method1"], "mobile_optimized": true|false, "pokitpal_ux_advantages": ["advantage1"]},
+"strategic_insights": {"threat_to_pokitpal": "level", "partnership_opportunity": "level", "market_share_vulnerability": "level", "customer_acquisition_difficulty": "level"},
+"pokitpal_strategic_recommendations": ["detailed_competitive_rec1", "detailed_market_entry_rec2", "detailed_differentiation_rec3"],
+"competitive_summary": {"overall_threat_level": "high|medium|low", "pokitpal_response_priority": "urgent|high|medium|low", "recommended_pokitpal_strategy": "compete_directly|differentiate|avoid|partner"},
+"data_quality": {"extraction_confidence": 0.9, "data_completeness": 0.8, "analysis_reliability": 0.85}}"""
+    }
+    
+    # Multi-page prompts and response schemas for the levels that are batched
+    BATCH_PROMPTS = {
+        "basic": ("""Extract competitor cashback data for each of the pages below.
+
+Return only JSON with one entry per item:
+{"results": [{"index": 0, "merchant_name": "name or null", "cashback_offer": "offer or null", "confidence": 0.9, "competitive_threat": "high|medium|low"}]}""",
+                  "cashback_offers", BASIC_BATCH_SCHEMA),
+        "standard": (COMPETITIVE_CONTEXT + """
+
+Analyze each competitor cashback merchant page below for Pokitpal's strategic planning.
+
+Return only JSON with one entry per item:
+{"results": [{"index": 0, "basic_info": {"merchant_name": "name", "cashback_offer": "rate", "offer_type": "percentage|fixed"}, 
+"competitive_intelligence": {"threat_level": "high|medium|low", "market_position": "premium|mid_market|budget", "pokitpal_opportunity": "high|medium|low"},
+"user_experience": {"ease_of_use": "excellent|good|average|poor", "mobile_optimized": true|false},
+"pokitpal_recommendations": ["competitive_rec1", "competitive_rec2"],
+"confidence": 0.9}]}""",
+                     "competitive_intelligence_batch", STANDARD_BATCH_SCHEMA)
+    }
+    
     def __init__(self):
+        os.makedirs(DATA_DIR, exist_ok=True)
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Connection': 'keep-alive'
         })
+        
+        # Sitemap fetches and parallel HEAD validation hit the same hosts; keep their connections pooled
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=3)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.setup_logging()
-        self.model_name = "gpt-3.5-turbo"
-        self.openai_client = None
+        self.model_name = "gpt-4o-mini"
         self.tokenizer = None
+        
+        # Async pipeline: sync wrappers share one private event loop (created on first use) so the
+        # async OpenAI client and HTTP session can be reused across runs
+        self.max_concurrency = 16
+        self.route_simple_pages = True  # Basic pages with one obvious offer go to SIMPLE_PAGE_MODEL
+        self.prevalidate_urls = False  # True: HEAD every candidate URL before scraping any of them
+        self.requests_per_second = 5
+        self._loop = None
+        self.api_concurrency = int(os.getenv('OPENAI_CONCURRENCY', '10'))
+        self._api_semaphores = {}  # event loop -> semaphore; asyncio primitives bind to one loop
+        # One token bucket per host: idle hosts allow a burst, busy hosts are throttled only when empty
+        self._host_limiters = defaultdict(lambda: AsyncLimiter(self.requests_per_second, 1))
+        self._http = None  # aiohttp session, opened on first fetch and kept until aclose()
         self.setup_ai()
         
         # Token tracking
@@ -47,6 +678,34 @@ class TokenOptimizedAIScraper:
         self.token_costs = 0.0
         self.max_input_tokens = 3000
         
+        # Basic and standard extractions are small, so concurrent pages share one API call
+        self.ai_batch_size = 8
+        self.ai_batch_linger = 0.2  # seconds to wait for more pages before sending a partial batch
+        self.max_batch_input_tokens = 12000
+        self._batch_queues = defaultdict(list)  # (model, level) -> queued pages
+        self._batch_queue_tokens = defaultdict(int)
+        self._batch_flush_handles = {}
+        self._batch_tasks = set()  # Running batch calls; the loop only keeps weak references to tasks
+        self._pages_in_flight = 0  # Once all of them are queued no other page can join a batch
+        
+        # Re-runs over unchanged pages reuse earlier AI results instead of paying for them again
+        self._llm_cache = diskcache.Cache('.llm_cache') if diskcache else None
+        self.refresh_llm_cache = False  # True: ignore cached results but still store fresh ones
+        self._content_cache = diskcache.Cache('.costcache', size_limit=CONTENT_CACHE_SIZE_LIMIT) if diskcache else None
+        self._content_results = {}  # Exact optimized content (any URL) -> AI result, for this session
+        self._semantic_cache = SemanticResultCache(os.path.join('.llm_cache', 'semantic')) if faiss else None
+        
+        # Near-duplicate template pages get a basic call instead of a full analysis
+        self._template_lsh = MinHashLSH(threshold=TEMPLATE_SIMILARITY_THRESHOLD, num_perm=TEMPLATE_NUM_PERM) if MinHashLSH else None
+        self._template_results = {}
+        
+        # Created on first use: HTML parsing runs on every core while the loop does I/O
+        self._process_pool = None
+        
+        # Per-session memo of scrape_page outcomes (as futures, so duplicates already in flight wait
+        # for the first fetch), so duplicate sitemap entries are fetched and analysed once
+        self._page_cache = {}
+        
         # Error tracking for monitoring
         self.error_stats = {
             'skipped_urls': 0,
@@ -57,7 +716,15 @@ class TokenOptimizedAIScraper:
             'timeout_errors': 0,
             'connection_errors': 0,
             'successful_extractions': 0,
-            'failed_extractions': 0
+            'failed_extractions': 0,
+            'traditional_extractions': 0,
+            'cached_extractions': 0,
+            'semantic_cache_hits': 0,
+            'template_extractions': 0,
+            'page_cache_hits': 0,
+            'cached_prompt_tokens': 0,
+            'duplicate_content_hits': 0,
+            'routed_pages': 0
         }
         
         # Intelligence levels configuration with model flexibility
@@ -81,6 +748,11 @@ class TokenOptimizedAIScraper:
         
         # Model pricing configuration
         self.model_pricing = {
+            "gpt-4o-mini": {
+                "input_cost_per_1k": 0.00015,
+                "output_cost_per_1k": 0.0006,
+                "name": "GPT-4o mini"
+            },
             "gpt-3.5-turbo": {
                 "input_cost_per_1k": 0.0015,
                 "output_cost_per_1k": 0.002,
@@ -95,6 +767,9 @@ class TokenOptimizedAIScraper:
         
         # Combined cost estimates (level + model combinations)
         self.cost_estimates = {
+            ("basic", "gpt-4o-mini"): 0.0001,
+            ("standard", "gpt-4o-mini"): 0.0003,
+            ("comprehensive", "gpt-4o-mini"): 0.0008,
             ("basic", "gpt-3.5-turbo"): 0.0008,
             ("basic", "gpt-4o"): 0.008,
             ("standard", "gpt-3.5-turbo"): 0.0015,
@@ -102,33 +777,114 @@ class TokenOptimizedAIScraper:
             ("comprehensive", "gpt-3.5-turbo"): 0.0035,
             ("comprehensive", "gpt-4o"): 0.015
         }
+        
+        # Per-token (input, output) prices, precomputed for calculate_dynamic_cost
+        self._token_prices = {
+            model: (info["input_cost_per_1k"] / 1000, info["output_cost_per_1k"] / 1000)
+            for model, info in self.model_pricing.items()
+        }
     
     def setup_logging(self):
-        """Setup logging"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
+        """Setup logging (file and console writes happen on a listener thread, off the event loop)"""
+        if not logging.getLogger().handlers:
+            log_queue = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(
+                log_queue,
                 logging.FileHandler('logs/token_scraper.log', encoding='utf-8'),
                 logging.StreamHandler()
-            ]
-        )
+            )
+            logging.basicConfig(
+                level=logging.INFO,
+                format='%(asctime)s - %(levelname)s - %(message)s',
+                handlers=[logging.handlers.QueueHandler(log_queue)]
+            )
+            listener.start()
+            atexit.register(listener.stop)
         self.logger = logging.getLogger(__name__)
     
     def setup_ai(self):
         """Initialize AI components"""
+        # Token counting and trimming work without an API key
+        self.tokenizer = _ENC
+        if not self.tokenizer:
+            self.logger.warning("Tokenizer unavailable, falling back to word estimates")
+        
+        # The client itself is built on first use, so sitemap-only work never opens an API connection pool
+        if not os.getenv('OPENAI_API_KEY'):
+            self.logger.warning("No OpenAI API key found. AI features disabled.")
+    
+    @cached_property
+    def openai_client(self):
+        """Async OpenAI client with a pooled HTTP transport, created on first use"""
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not api_key:
+            return None
+        
+        # Every call goes to one API host: over HTTP/2 a few connections multiplex all in-flight requests
+        if h2:
+            limits = httpx.Limits(max_connections=4, max_keepalive_connections=4)
+        else:
+            limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        
         try:
-            api_key = os.getenv('OPENAI_API_KEY')
-            if not api_key:
-                self.logger.warning("No OpenAI API key found. AI features disabled.")
-                return
-            
-            self.openai_client = openai.OpenAI(api_key=api_key)
-            self.tokenizer = tiktoken.encoding_for_model(self.model_name)
+            # The SDK retries rate limits, timeouts and 5xx responses with exponential backoff
+            client = openai.AsyncOpenAI(
+                api_key=api_key,
+                max_retries=int(os.getenv('OPENAI_MAX_RETRIES', '3')),
+                http_client=httpx.AsyncClient(http2=h2 is not None, limits=limits)
+            )
             self.logger.info("AI components initialized successfully")
-            
+            return client
         except Exception as e:
             self.logger.warning(f"AI setup failed: {e}")
+            return None
+    
+    def run_async(self, coro):
+        """Run a coroutine to completion on the scraper's event loop"""
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+    
+    @property
+    def _api_semaphore(self):
+        """Cap on concurrent OpenAI requests for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._api_semaphores:
+            # Drop semaphores of loops that have finished (asyncio.run closes its loop on exit)
+            self._api_semaphores = {other: sem for other, sem in self._api_semaphores.items() if not other.is_closed()}
+            self._api_semaphores[loop] = asyncio.Semaphore(self.api_concurrency)
+        return self._api_semaphores[loop]
+    
+    async def aclose(self):
+        """Close the shared HTTP session and the OpenAI client's connection pool"""
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        client = self.__dict__.pop('openai_client', None)
+        if client:
+            await client.close()
+    
+    def close(self):
+        """Stop worker processes, release the result caches and close the scraper's event loop"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Sync callers run everything on the scraper's own loop; async callers await aclose() themselves
+            if self._loop is not None and not self._loop.is_closed():
+                self.run_async(self.aclose())
+                self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+                self._loop.close()
+        self._release()
+    
+    def _release(self):
+        """Stop worker processes and close the on-disk caches (no event loop needed)"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
+        if self._llm_cache is not None:
+            self._llm_cache.close()
+        if self._content_cache is not None:
+            self._content_cache.close()
     
     def get_cost_estimate(self, intelligence_level, model_name):
         """Get cost estimate for intelligence level + model combination"""
@@ -140,216 +896,518 @@ class TokenOptimizedAIScraper:
     
     def get_model_info(self, model_name):
         """Get model information including pricing"""
-        return self.model_pricing.get(model_name, self.model_pricing["gpt-3.5-turbo"])
+        return self.model_pricing.get(model_name, self.model_pricing["gpt-4o-mini"])
     
-    def calculate_dynamic_cost(self, intelligence_level, model_name, input_tokens, output_tokens):
+    def response_format_for(self, model_name, schema_name, schema):
+        """Strict JSON schema output where the model supports it, plain JSON mode otherwise"""
+        if model_name in STRUCTURED_OUTPUT_MODELS:
+            return {"type": "json_schema", "json_schema": {"name": schema_name, "schema": schema, "strict": True}}
+        return {"type": "json_object"}
+    
+    def calculate_dynamic_cost(self, intelligence_level, model_name, input_tokens, output_tokens, cached_input_tokens=0):
         """Calculate actual cost based on token usage"""
-        model_info = self.get_model_info(model_name)
-        input_cost = (input_tokens * model_info["input_cost_per_1k"]) / 1000
-        output_cost = (output_tokens * model_info["output_cost_per_1k"]) / 1000
-        return input_cost + output_cost
+        input_price, output_price = self._token_prices.get(model_name, self._token_prices["gpt-4o-mini"])
+        billed_input_tokens = input_tokens - cached_input_tokens * CACHED_INPUT_DISCOUNT
+        return billed_input_tokens * input_price + output_tokens * output_price
     
-    def count_tokens(self, text):
-        """Count tokens in text"""
+    def count_tokens(self, text, cache=False):
+        """Count tokens in text (cache=True memoizes strings that repeat across pages)"""
         if not self.tokenizer:
             return len(text.split()) * 1.3
-        return len(self.tokenizer.encode(text))
+        if cache:
+            return _cached_token_count(text)
+        return len(self.tokenizer.encode(text, disallowed_special=()))
     
     def optimize_content_for_tokens(self, html_content, url):
         """Optimize HTML content to minimize tokens while preserving important info"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove unnecessary elements
-        for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-            element.decompose()
-        
-        relevant_sections = []
-        
-        # 1. Look for cashback-related keywords in various elements
-        cashback_keywords = ['cashback', 'cash back', 'reward', 'earn', '%', 'discount', 'offer', 'deal']
-        
-        for keyword in cashback_keywords:
-            elements = soup.find_all(text=re.compile(keyword, re.I))
-            for element in elements[:2]:  # Limit to first 2 matches per keyword
-                parent = element.parent
-                if parent and parent.name not in ['script', 'style']:
-                    text = parent.get_text().strip()
-                    if text and len(text) < 200:  # Keep sections under 200 chars
-                        relevant_sections.append(text)
-        
-        # 2. Get title and main content
-        title = soup.find('title')
-        if title:
-            relevant_sections.insert(0, f"TITLE: {title.get_text().strip()}")
-        
-        # 3. Look for percentage and dollar amounts
-        all_text = soup.get_text()
-        percentage_matches = re.findall(r'[^.]*\d+\.?\d*%[^.]*', all_text)
-        for match in percentage_matches[:3]:
-            relevant_sections.append(f"RATE: {match.strip()}")
-        
-        # Combine and optimize
-        optimized_content = "\n".join(relevant_sections[:12])  # Limit sections
+        return optimize_html_content(html_content, self.max_input_tokens)
+    
+    async def optimize_content_async(self, html_content, url):
+        """Optimize page content in the process pool so parsing overlaps with network I/O"""
+        # Re-scraped pages are often byte-identical, so skip parsing and tokenizing them again
+        cache_key = None
+        if self._content_cache is not None:
+            digest = hashlib.blake2b(html_content.encode(), digest_size=16).hexdigest()
+            cache_key = f"{self.max_input_tokens}:{digest}"
+            cached = self._content_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
-        # Trim if too long
-        token_count = self.count_tokens(optimized_content)
-        if token_count > self.max_input_tokens:
-            words = optimized_content.split()
-            max_words = int(self.max_input_tokens * 0.75)
-            optimized_content = " ".join(words[:max_words])
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        loop = asyncio.get_running_loop()
+        optimized = await loop.run_in_executor(self._process_pool, optimize_html_content, html_content, self.max_input_tokens)
         
-        return optimized_content, self.count_tokens(optimized_content)
+        if cache_key is not None:
+            self._content_cache.set(cache_key, optimized)
+        return optimized
     
     def create_optimized_prompt(self, content, url, intelligence_level="standard"):
         """Create a token-optimized prompt based on intelligence level with competitive analysis context"""
-        
-        # Add competitive context for Pokitpal
-        competitive_context = """
-CONTEXT: This analysis is for Pokitpal, a cashback/rewards platform. Analyze these competitor cashback merchants to understand:
-- How they position their offers vs Pokitpal's potential offerings
-- Market gaps Pokitpal could exploit
-- Competitive threats and opportunities
-- Strategic recommendations for Pokitpal's competitive positioning
-"""
-        
-        if intelligence_level == "basic":
-            prompt = f"""{competitive_context}
-
-Extract competitor cashback data from this webpage content.
+        # Page-specific text goes last so the static prefix is byte-identical across calls
+        template = self.PROMPT_TEMPLATES.get(intelligence_level, self.PROMPT_TEMPLATES["comprehensive"])
+        return f"""{template}
 
 URL: {url}
-Content: {content}
-
-Return only JSON:
-{{"merchant_name": "name or null", "cashback_offer": "offer or null", "confidence": 0.9, "competitive_threat": "high|medium|low"}}"""
+Content: {content}"""
+    
+    def traditional_extract(self, html_content, url):
+        """Extract merchant and cashback rate with known site selectors or an obvious rate, without calling AI"""
+        host = urlparse(url).netloc.lower()
+        merchant_xpath, cashback_xpaths = next(
+            (rules for domain, rules in self.SITE_RULES.items() if host.endswith(domain)), (_H1_XPATH, ())
+        )
+        tree = _parse_html(html_content)
+        if tree is None:
+            return None
         
-        elif intelligence_level == "standard":
-            prompt = f"""{competitive_context}
-
-Analyze this competitor cashback merchant page for Pokitpal's strategic planning.
-
-URL: {url}
-Content: {content}
-
-Return JSON with competitive intelligence:
-{{"basic_info": {{"merchant_name": "name", "cashback_offer": "rate", "offer_type": "percentage|fixed"}}, 
-"competitive_intelligence": {{"threat_level": "high|medium|low", "market_position": "premium|mid_market|budget", "pokitpal_opportunity": "high|medium|low"}},
-"user_experience": {{"ease_of_use": "excellent|good|average|poor", "mobile_optimized": true|false}},
-"pokitpal_recommendations": ["competitive_rec1", "competitive_rec2"],
-"confidence": 0.9}}"""
+        merchant_elements = merchant_xpath(tree)
+        if not merchant_elements:
+            return None
+        merchant_name = " ".join(merchant_elements[0].text_content().split())
         
-        else:  # comprehensive
-            prompt = f"""{competitive_context}
-
-Provide comprehensive competitive intelligence analysis of this cashback merchant for Pokitpal's strategic advantage.
-
-URL: {url}
-Content: {content}
-
-Return detailed competitive analysis JSON:
-{{"basic_info": {{"merchant_name": "name", "cashback_offer": "rate", "offer_type": "type"}},
-"competitive_positioning": {{"market_position": "position", "unique_selling_points": ["point1"], "competitive_advantages": ["adv1"], "weaknesses_pokitpal_can_exploit": ["weakness1"]}},
-"offer_intelligence": {{"offer_attractiveness": "level", "offer_complexity": "level", "pokitpal_differentiation_opportunity": "high|medium|low", "special_conditions": ["cond1"], "exclusions": ["excl1"]}},
-"user_experience": {{"ease_of_use": "level", "signup_process": "complexity", "payment_methods": ["method1"], "mobile_optimized": true|false, "pokitpal_ux_advantages": ["advantage1"]}},
-"strategic_insights": {{"threat_to_pokitpal": "level", "partnership_opportunity": "level", "market_share_vulnerability": "level", "customer_acquisition_difficulty": "level"}},
-"pokitpal_strategic_recommendations": ["detailed_competitive_rec1", "detailed_market_entry_rec2", "detailed_differentiation_rec3"],
-"competitive_summary": {{"overall_threat_level": "high|medium|low", "pokitpal_response_priority": "urgent|high|medium|low", "recommended_pokitpal_strategy": "compete_directly|differentiate|avoid|partner"}},
-"data_quality": {{"extraction_confidence": 0.9, "data_completeness": 0.8, "analysis_reliability": 0.85}}}}"""
+        cashback_offer = None
+        confidence = 0.9
+        for cashback_xpath in cashback_xpaths:
+            cashback_elements = cashback_xpath(tree)
+            if cashback_elements:
+                cashback_offer = " ".join(cashback_elements[0].text_content().split())
+                break
+        
+        if not cashback_offer:
+            # Unknown layout: accept only explicit "N% cashback" style statements in the merchant's own section,
+            # and only when they all name one rate (similar-store lists quote other merchants' rates)
+            matches = list(_OBVIOUS_CASHBACK_RE.finditer(_visible_text(_offer_scope(tree, merchant_elements[0]))))
+            if len({_RATE_VALUE_RE.search(match.group()).group() for match in matches}) != 1:
+                return None
+            cashback_offer = matches[0].group()
+            confidence = 0.8
         
-        return prompt
+        # Only trust the result when it clearly contains a rate
+        if not merchant_name or not ('%' in cashback_offer or '$' in cashback_offer):
+            return None
+        
+        return {
+            "merchant": merchant_name,
+            "cashback_offer": cashback_offer,
+            "competitive_threat": "unknown",
+            "confidence": confidence,
+            "method": "Traditional_Selector" if confidence > 0.8 else "Traditional_Regex",
+            "tokens_used": 0,
+            "cost": 0.0,
+            "url": url,
+            "scraped_at": datetime.now().isoformat()
+        }
     
-    def ai_extract(self, html_content, url, intelligence_level="standard", model_name="gpt-3.5-turbo"):
+    async def ai_extract(self, html_content, url, intelligence_level="standard", model_name="gpt-4o-mini"):
         """Use AI to extract merchant data with intelligence levels and model selection"""
         if not self.openai_client:
             return None
         
         try:
-            # Get intelligence level config
-            level_config = self.intelligence_levels.get(intelligence_level, self.intelligence_levels["standard"])
-            
             # Optimize content for token efficiency
-            optimized_content, input_tokens = self.optimize_content_for_tokens(html_content, url)
+            optimized_content, input_tokens = await self.optimize_content_async(html_content, url)
+            model_name = self.route_model(optimized_content, input_tokens, intelligence_level, model_name, url)
             
-            # Create prompt based on intelligence level
-            prompt = self.create_optimized_prompt(optimized_content, url, intelligence_level)
+            cache_key = self._llm_cache_key(model_name, intelligence_level, url, optimized_content)
+            cached = self._get_cached_result(cache_key)
+            if cached:
+                return cached
             
-            # Create system message based on intelligence level
-            if intelligence_level == "basic":
-                system_message = "You are a competitive intelligence analyst for Pokitpal (a cashback platform). Extract competitor data and assess competitive threats. Return only valid JSON."
-            elif intelligence_level == "standard":
-                system_message = "You are a competitive intelligence analyst for Pokitpal. Analyze competitor cashback platforms to identify threats, opportunities, and strategic recommendations for Pokitpal's competitive advantage."
-            else:  # comprehensive
-                system_message = "You are a senior competitive intelligence analyst for Pokitpal, a cashback/rewards platform. Provide detailed competitive analysis to help Pokitpal strategically position against competitors, identify market gaps, and develop winning strategies."
+            content_key = self._content_key(model_name, intelligence_level, optimized_content)
+            duplicate = self._get_duplicate_result(content_key, url)
+            if duplicate:
+                return duplicate
             
-            # Count total input tokens
-            total_input_tokens = self.count_tokens(system_message + prompt)
+            # Pages similar to or built from the same template as an analysed page reuse its analysis,
+            # but only with their own merchant and rate from a fresh basic extraction
+            # (basic results are nothing but merchant and rate, so there is nothing to reuse)
+            vector = fingerprint = similar = None
+            if intelligence_level != "basic":
+                semantic_key = (model_name, intelligence_level)
+                vector = await self._semantic_vector(optimized_content)
+                if vector is not None and not self.refresh_llm_cache:
+                    hit = self._semantic_cache.lookup(semantic_key, vector)
+                    if hit:
+                        similar = (hit, "_Semantic", 'semantic_cache_hits')
+                
+                if self._template_lsh is not None:
+                    fingerprint = self._content_fingerprint(optimized_content)
+                    template_key = similar is None and self._match_template(model_name, intelligence_level, fingerprint)
+                    if template_key:
+                        similar = (self._template_results[template_key], "_Template", 'template_extractions')
             
-            # Use the selected model
-            model_info = self.get_model_info(model_name)
-            self.logger.info(f"AI extraction ({intelligence_level}) - Using {model_info['name']} - Input tokens: {total_input_tokens}")
+            if similar:
+                similar_result, method_suffix, stat = similar
+                result = await self._extract_from_similar(similar_result, method_suffix, optimized_content, input_tokens, url, model_name)
+                if result:
+                    self.error_stats[stat] += 1
+                    self._store_cached_result(cache_key, result)
+                    return result
             
-            # Make API call with selected model and intelligence level settings
-            response = self.openai_client.chat.completions.create(
-                model=model_name,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=level_config["temperature"],
-                max_tokens=level_config["max_tokens"]
-            )
+            result = await self._ai_complete(optimized_content, input_tokens, url, intelligence_level, model_name)
             
-            # Track usage
-            usage = response.usage
-            total_tokens = usage.total_tokens
+            self._store_cached_result(cache_key, result)
+            if result and not result.get('method', '').endswith('_Error'):
+                self._content_results[content_key] = result
+                if vector is not None:
+                    self._semantic_cache.add(semantic_key, vector, result)
+                if fingerprint is not None:
+                    template_key = f"{model_name}|{intelligence_level}|{len(self._template_results)}"
+                    self._template_lsh.insert(template_key, fingerprint)
+                    self._template_results[template_key] = result
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"AI extraction failed: {e}")
+            return None
+    
+    def route_model(self, optimized_content, input_tokens, intelligence_level, model_name, url=None):
+        """Cheapest model for basic pages with one obvious offer, otherwise the requested model"""
+        if (not self.route_simple_pages or intelligence_level != "basic" or model_name == SIMPLE_PAGE_MODEL
+                or input_tokens > SIMPLE_PAGE_TOKENS or len(set(_RATE_VALUE_RE.findall(optimized_content))) != 1):
+            return model_name
+        
+        self.error_stats['routed_pages'] += 1
+        self.logger.info("🔀 Simple page, using %s instead of %s: %s", SIMPLE_PAGE_MODEL, model_name, url)
+        return SIMPLE_PAGE_MODEL
+    
+    def _content_fingerprint(self, optimized_content):
+        """MinHash over word 3-shingles of optimized page content"""
+        words = optimized_content.lower().split()
+        fingerprint = MinHash(num_perm=TEMPLATE_NUM_PERM)
+        fingerprint.update_batch([" ".join(words[i:i + 3]).encode('utf-8') for i in range(max(len(words) - 2, 1))])
+        return fingerprint
+    
+    def _match_template(self, model_name, intelligence_level, fingerprint):
+        """Key of an analysed page at the same level and model that this page nearly duplicates, if any"""
+        prefix = f"{model_name}|{intelligence_level}|"
+        return next((key for key in self._template_lsh.query(fingerprint) if key.startswith(prefix)), None)
+    
+    async def _extract_from_similar(self, similar_result, method_suffix, optimized_content, input_tokens, url, model_name):
+        """Basic extraction merged into the analysis of a near-identical page (None if the basic call fails)"""
+        basic = await self._ai_complete(optimized_content, input_tokens, url, "basic", model_name)
+        if not basic or basic['method'].endswith('_Error'):
+            return None
+        
+        result = dict(similar_result)
+        # Comprehensive results keep merchant data under basic_info and bookkeeping under extraction_metadata
+        if 'extraction_metadata' in result:
+            result['basic_info'] = {**result.get('basic_info', {}), 'merchant_name': basic['merchant'], 'cashback_offer': basic['cashback_offer']}
+            result['extraction_metadata'] = metadata = dict(result['extraction_metadata'])
+        else:
+            result.update(merchant=basic['merchant'], cashback_offer=basic['cashback_offer'], confidence=basic['confidence'])
+            metadata = result
+        metadata.update(tokens_used=basic['tokens_used'], cost=basic['cost'], url=url, scraped_at=basic['scraped_at'])
+        metadata['method'] = f"{metadata.get('method', 'AI')}{method_suffix}"
+        return result
+    
+    async def _ai_complete(self, optimized_content, input_tokens, url, intelligence_level, model_name):
+        """One chat completion for already optimized page content, with usage tracking"""
+        system_message, request = self.build_chat_request(optimized_content, url, intelligence_level, model_name)
+        
+        # Content tokens are already counted; only the fixed parts of the prompt and the URL remain
+        total_input_tokens = (input_tokens + self.count_tokens(system_message, cache=True)
+                              + self.count_tokens(self.create_optimized_prompt("", "", intelligence_level), cache=True)
+                              + self.count_tokens(url))
+        
+        # Use the selected model
+        model_info = self.get_model_info(model_name)
+        self.logger.info("AI extraction (%s) - Using %s - Input tokens: %s", intelligence_level, model_info['name'], total_input_tokens)
+        
+        # Make API call with selected model and intelligence level settings
+        async with self._api_semaphore:
+            response = await self.openai_client.chat.completions.create(**request)
+        
+        # Track usage
+        usage = response.usage
+        total_tokens = usage.total_tokens
+        
+        # Calculate cost using dynamic pricing
+        cached_tokens = self._cached_prompt_tokens(usage)
+        cost = self.calculate_dynamic_cost(intelligence_level, model_name, usage.prompt_tokens, usage.completion_tokens, cached_tokens)
+        
+        self.total_tokens_used += total_tokens
+        self.total_api_calls += 1
+        self.token_costs += cost
+        
+        ai_content = response.choices[0].message.content.strip()
+        return self.parse_ai_response(ai_content, url, intelligence_level, total_tokens, cost)
+    
+    def _cached_prompt_tokens(self, usage):
+        """Prompt tokens served from OpenAI's prompt cache for one response"""
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', None) or 0
+        self.error_stats['cached_prompt_tokens'] += cached_tokens
+        return cached_tokens
+    
+    def build_chat_request(self, optimized_content, url, intelligence_level, model_name):
+        """System message and chat completion parameters for one page"""
+        level_config = self.intelligence_levels.get(intelligence_level, self.intelligence_levels["standard"])
+        
+        # Create prompt based on intelligence level
+        prompt = self.create_optimized_prompt(optimized_content, url, intelligence_level)
+        
+        system_message = self.SYSTEM_MESSAGES.get(intelligence_level, self.SYSTEM_MESSAGES["comprehensive"])
+        
+        request = {
+            "model": model_name,
+            "messages": [
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": level_config["temperature"],
+            "max_tokens": level_config["max_tokens"]
+        }
+        schema_name, schema = RESULT_SCHEMAS.get(intelligence_level, RESULT_SCHEMAS["comprehensive"])
+        request["response_format"] = self.response_format_for(model_name, schema_name, schema)
+        return system_message, request
+    
+    def parse_ai_response(self, ai_content, url, intelligence_level, tokens_used, cost):
+        """Parse an AI response based on intelligence level (the reply is decoded once)"""
+        data = _extract_json(ai_content)
+        if data is None:
+            return self.parsing_error_result(url, tokens_used, cost)
+        
+        build_result = {
+            "basic": self.build_basic_result,
+            "standard": self.build_standard_result
+        }.get(intelligence_level, self.build_comprehensive_result)
+        try:
+            return build_result(data, url, tokens_used, cost)
+        except Exception as e:
+            self.logger.warning(f"{intelligence_level.title()} competitive response parsing failed: {e}")
+            return self.parsing_error_result(url, tokens_used, cost)
+    
+    def ai_extract_sync(self, html_content, url, intelligence_level="standard", model_name="gpt-4o-mini"):
+        """Blocking wrapper around ai_extract for callers outside the event loop"""
+        return self.run_async(self.ai_extract(html_content, url, intelligence_level, model_name))
+    
+    async def ai_extract_batched(self, html_content, url, model_name="gpt-4o-mini", intelligence_level="basic"):
+        """Queue a basic or standard extraction so it shares an API call with other pages in flight"""
+        if not self.openai_client:
+            return None
+        
+        optimized_content, content_tokens = await self.optimize_content_async(html_content, url)
+        model_name = self.route_model(optimized_content, content_tokens, intelligence_level, model_name, url)
+        
+        cached = self._get_cached_result(self._llm_cache_key(model_name, intelligence_level, url, optimized_content))
+        if cached:
+            return cached
+        duplicate = self._get_duplicate_result(self._content_key(model_name, intelligence_level, optimized_content), url)
+        if duplicate:
+            return duplicate
+        
+        # Keep the combined prompt well inside the model's context window
+        key = (model_name, intelligence_level)
+        if self._batch_queues[key] and self._batch_queue_tokens[key] + content_tokens > self.max_batch_input_tokens:
+            self._flush_ai_batch(key)
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch_queues[key].append((url, optimized_content, model_name, future))
+        self._batch_queue_tokens[key] += content_tokens
+        
+        # Small runs send as soon as every page in flight has been queued rather than lingering
+        if len(self._batch_queues[key]) >= min(self.ai_batch_size, self._pages_in_flight or self.ai_batch_size):
+            self._flush_ai_batch(key)
+        elif key not in self._batch_flush_handles:
+            self._batch_flush_handles[key] = loop.call_later(self.ai_batch_linger, self._flush_ai_batch, key)
+        
+        return await future
+    
+    def _flush_ai_batch(self, key):
+        """Send every page queued for one model and level in one API call"""
+        handle = self._batch_flush_handles.pop(key, None)
+        if handle:
+            handle.cancel()
+        
+        items = self._batch_queues.pop(key, [])
+        content_tokens = self._batch_queue_tokens.pop(key, None)
+        if items:
+            task = asyncio.ensure_future(self.ai_extract_batch(items, key[1], content_tokens))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+    
+    async def ai_extract_batch(self, items, intelligence_level="basic", content_tokens=None):
+        """Extract competitor data for several pages with a single API call"""
+        model_name = items[0][2]
+        level_config = self.intelligence_levels[intelligence_level]
+        prompt_prefix, schema_name, schema = self.BATCH_PROMPTS[intelligence_level]
+        build_result = self.build_basic_result if intelligence_level == "basic" else self.build_standard_result
+        
+        system_message = self.SYSTEM_MESSAGES[intelligence_level]
+        pages = "\n".join(f"--- ITEM {i} ---\nURL: {url}\n{content}" for i, (url, content, _, _) in enumerate(items))
+        prompt = f"""{prompt_prefix}
+
+{pages}"""
+        
+        try:
+            # The prompt shell is counted once per process; page tokens were counted when they were queued
+            if content_tokens is None:
+                input_tokens = self.count_tokens(system_message + prompt)
+            else:
+                input_tokens = (self.count_tokens(system_message, cache=True) + self.count_tokens(prompt_prefix, cache=True)
+                                + content_tokens)
+            self.logger.info("AI batch extraction (%s) - %d pages - Input tokens: %s", intelligence_level, len(items), input_tokens)
+            
+            async with self._api_semaphore:
+                response = await self.openai_client.chat.completions.create(
+                    model=model_name,
+                    messages=[
+                        {"role": "system", "content": system_message},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=level_config["temperature"],
+                    max_tokens=level_config["max_tokens"] * len(items),
+                    response_format=self.response_format_for(model_name, schema_name, schema)
+                )
             
-            # Calculate cost using dynamic pricing
-            cost = self.calculate_dynamic_cost(intelligence_level, model_name, usage.prompt_tokens, usage.completion_tokens)
+            usage = response.usage
+            cost = self.calculate_dynamic_cost(intelligence_level, model_name, usage.prompt_tokens, usage.completion_tokens,
+                                               self._cached_prompt_tokens(usage))
             
-            self.total_tokens_used += total_tokens
+            self.total_tokens_used += usage.total_tokens
             self.total_api_calls += 1
             self.token_costs += cost
             
-            # Parse response based on intelligence level
-            ai_content = response.choices[0].message.content.strip()
+            # Output cut off at max_tokens: the JSON is incomplete, so ask again in smaller batches
+            if response.choices[0].finish_reason == "length" and len(items) > 1:
+                self.logger.warning(f"⚠️ Batch output for {len(items)} pages was truncated - splitting")
+                await self._split_ai_batch(items, intelligence_level)
+                return
             
-            if intelligence_level == "basic":
-                result = self.parse_basic_response(ai_content, url, total_tokens, cost)
-            elif intelligence_level == "standard":
-                result = self.parse_standard_response(ai_content, url, total_tokens, cost)
-            else:  # comprehensive
-                result = self.parse_comprehensive_response(ai_content, url, total_tokens, cost)
+            entries = (_extract_json(response.choices[0].message.content) or {}).get("results", [])
+            by_index = {entry.get("index"): entry for entry in entries if isinstance(entry, dict)}
             
-            return result
+            # Split usage evenly so per-page token and budget accounting still adds up
+            page_tokens = usage.total_tokens // len(items)
+            page_cost = cost / len(items)
             
+            for i, (url, content, _, future) in enumerate(items):
+                data = by_index.get(i)
+                result = build_result(data, url, page_tokens, page_cost) if data else None
+                self._store_cached_result(self._llm_cache_key(model_name, intelligence_level, url, content), result)
+                if result:
+                    self._content_results[self._content_key(model_name, intelligence_level, content)] = result
+                if not future.done():
+                    future.set_result(result)
+        
+        except openai.BadRequestError as e:
+            if len(items) > 1 and e.code == "context_length_exceeded":
+                self.logger.warning(f"⚠️ Batch of {len(items)} pages exceeds the {model_name} context window - splitting")
+                await self._split_ai_batch(items, intelligence_level)
+                return
+            self.logger.error(f"AI batch extraction failed: {e}")
+            self._fail_ai_batch(items)
         except Exception as e:
-            self.logger.error(f"AI extraction failed: {e}")
+            self.logger.error(f"AI batch extraction failed: {e}")
+            self._fail_ai_batch(items)
+    
+    async def _split_ai_batch(self, items, intelligence_level):
+        """Retry a batch as two halves (each half splits again if it still does not fit)"""
+        half = len(items) // 2
+        await asyncio.gather(
+            self.ai_extract_batch(items[:half], intelligence_level),
+            self.ai_extract_batch(items[half:], intelligence_level)
+        )
+    
+    def _fail_ai_batch(self, items):
+        """Resolve every page still waiting on a batch with no result"""
+        for _, _, _, future in items:
+            if not future.done():
+                future.set_result(None)
+    
+    def _llm_cache_key(self, model_name, intelligence_level, url, optimized_content):
+        """Hash everything that determines an AI extraction result"""
+        return hashlib.blake2b(
+            f"{model_name}\0{intelligence_level}\0{url}\0{optimized_content}".encode('utf-8'),
+            digest_size=16
+        ).hexdigest()
+    
+    def _content_key(self, model_name, intelligence_level, optimized_content):
+        """Hash of the optimized content alone, shared by every URL that serves it"""
+        return hashlib.blake2b(
+            f"{model_name}\0{intelligence_level}\0{optimized_content}".encode('utf-8'),
+            digest_size=16
+        ).digest()
+    
+    def _get_duplicate_result(self, content_key, url):
+        """Free copy of the result for identical content already analysed under another URL, or None"""
+        if self.refresh_llm_cache:
+            return None
+        result = self._content_results.get(content_key)
+        if result is None:
+            return None
+        
+        self.error_stats['duplicate_content_hits'] += 1
+        return self._as_free_result(result, "_Duplicate", url=url)
+    
+    def _get_cached_result(self, cache_key):
+        """Return a cached AI result marked as free, or None on a miss"""
+        if self._llm_cache is None or self.refresh_llm_cache:
+            return None
+        result = self._llm_cache.get(cache_key)
+        if result is None:
+            return None
+        
+        self.error_stats['cached_extractions'] += 1
+        return self._as_free_result(result, "_Cached")
+    
+    async def _semantic_vector(self, optimized_content):
+        """Embed optimized content for the semantic cache, or None when it is unavailable"""
+        if self._semantic_cache is None:
             return None
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._semantic_cache.embed, optimized_content)
+        except Exception as e:
+            self.logger.warning(f"Semantic cache disabled: {e}")
+            self._semantic_cache = None
+            return None
+    
+    def _as_free_result(self, result, method_suffix, url=None):
+        """Copy a result with zero tokens and cost, so reuse never counts against budgets"""
+        result = dict(result)
+        # Comprehensive results keep their bookkeeping under extraction_metadata
+        if 'extraction_metadata' in result:
+            result['extraction_metadata'] = metadata = dict(result['extraction_metadata'])
+        else:
+            metadata = result
+        metadata.update(tokens_used=0, cost=0.0, scraped_at=datetime.now().isoformat())
+        if url:
+            metadata['url'] = url
+        metadata['method'] = f"{metadata.get('method', 'AI')}{method_suffix}"
+        return result
+    
+    def _store_cached_result(self, cache_key, result):
+        """Cache a successful AI result"""
+        if self._llm_cache is None or not result:
+            return
+        if result.get('method', '').endswith('_Error'):
+            return
+        self._llm_cache.set(cache_key, result, expire=LLM_CACHE_EXPIRE)
+    
+    def build_basic_result(self, data, url, tokens_used, cost):
+        """Build a basic result record from parsed AI data"""
+        return {
+            "merchant": data.get("merchant_name", "Unknown"),
+            "cashback_offer": data.get("cashback_offer", "Not found"),
+            "competitive_threat": data.get("competitive_threat", "unknown"),
+            "confidence": data.get("confidence", 0.5),
+            "method": "AI_Basic_Competitive",
+            "tokens_used": tokens_used,
+            "cost": cost,
+            "url": url,
+            "scraped_at": datetime.now().isoformat()
+        }
     
     def parse_basic_response(self, ai_content, url, tokens_used, cost):
         """Parse basic AI response with competitive context"""
-        try:
-            json_start = ai_content.find('{')
-            json_end = ai_content.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = ai_content[json_start:json_end]
-                data = json.loads(json_str)
-                
-                return {
-                    "merchant": data.get("merchant_name", "Unknown"),
-                    "cashback_offer": data.get("cashback_offer", "Not found"),
-                    "competitive_threat": data.get("competitive_threat", "unknown"),
-                    "confidence": data.get("confidence", 0.5),
-                    "method": "AI_Basic_Competitive",
-                    "tokens_used": tokens_used,
-                    "cost": cost,
-                    "url": url,
-                    "scraped_at": datetime.now().isoformat()
-                }
-        except:
-            pass
-        
+        return self.parse_ai_response(ai_content, url, "basic", tokens_used, cost)
+    
+    def parsing_error_result(self, url, tokens_used, cost):
+        """Placeholder record for a paid AI reply that held no usable JSON"""
         return {
             "merchant": "Parsing Error",
             "cashback_offer": "Could not extract",
@@ -364,134 +1422,99 @@ Return detailed competitive analysis JSON:
     
     def parse_standard_response(self, ai_content, url, tokens_used, cost):
         """Parse standard intelligence AI response with competitive context"""
-        try:
-            json_start = ai_content.find('{')
-            json_end = ai_content.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = ai_content[json_start:json_end]
-                data = json.loads(json_str)
-                
-                basic_info = data.get("basic_info", {})
-                competitive_intel = data.get("competitive_intelligence", {})
-                user_experience = data.get("user_experience", {})
-                recommendations = data.get("pokitpal_recommendations", [])
-                
-                return {
-                    "merchant": basic_info.get("merchant_name", "Unknown"),
-                    "cashback_offer": basic_info.get("cashback_offer", "Not found"),
-                    "offer_type": basic_info.get("offer_type", "unknown"),
-                    "competitive_threat_level": competitive_intel.get("threat_level", "unknown"),
-                    "market_position": competitive_intel.get("market_position", "unknown"),
-                    "pokitpal_opportunity": competitive_intel.get("pokitpal_opportunity", "unknown"),
-                    "ease_of_use": user_experience.get("ease_of_use", "unknown"),
-                    "mobile_optimized": user_experience.get("mobile_optimized", None),
-                    "pokitpal_strategic_recommendations": recommendations[:2],
-                    "confidence": data.get("confidence", 0.7),
-                    "method": "AI_Standard_Competitive",
-                    "tokens_used": tokens_used,
-                    "cost": cost,
-                    "url": url,
-                    "scraped_at": datetime.now().isoformat()
-                }
-        except Exception as e:
-            self.logger.warning(f"Standard competitive response parsing failed: {e}")
+        return self.parse_ai_response(ai_content, url, "standard", tokens_used, cost)
+    
+    def build_standard_result(self, data, url, tokens_used, cost):
+        """Build a standard result record from parsed AI data"""
+        basic_info = data.get("basic_info", {})
+        competitive_intel = data.get("competitive_intelligence", {})
+        user_experience = data.get("user_experience", {})
+        recommendations = data.get("pokitpal_recommendations", [])
         
-        return self.parse_basic_response(ai_content, url, tokens_used, cost)
+        return {
+            "merchant": basic_info.get("merchant_name", "Unknown"),
+            "cashback_offer": basic_info.get("cashback_offer", "Not found"),
+            "offer_type": basic_info.get("offer_type", "unknown"),
+            "competitive_threat_level": competitive_intel.get("threat_level", "unknown"),
+            "market_position": competitive_intel.get("market_position", "unknown"),
+            "pokitpal_opportunity": competitive_intel.get("pokitpal_opportunity", "unknown"),
+            "ease_of_use": user_experience.get("ease_of_use", "unknown"),
+            "mobile_optimized": user_experience.get("mobile_optimized", None),
+            "pokitpal_strategic_recommendations": '; '.join(recommendations[:2]),  # CSV-ready as parsed
+            "confidence": data.get("confidence", 0.7),
+            "method": "AI_Standard_Competitive",
+            "tokens_used": tokens_used,
+            "cost": cost,
+            "url": url,
+            "scraped_at": datetime.now().isoformat()
+        }
     
     def parse_comprehensive_response(self, ai_content, url, tokens_used, cost):
         """Parse comprehensive intelligence AI response"""
-        try:
-            json_start = ai_content.find('{')
-            json_end = ai_content.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = ai_content[json_start:json_end]
-                data = json.loads(json_str)
-                
-                # Add metadata to the comprehensive analysis
-                data['extraction_metadata'] = {
-                    'method': 'AI_Comprehensive',
-                    'tokens_used': tokens_used,
-                    'cost': cost,
-                    'url': url,
-                    'scraped_at': datetime.now().isoformat(),
-                    'intelligence_level': 'comprehensive'
-                }
-                
-                return data
-        except Exception as e:
-            self.logger.warning(f"Comprehensive response parsing failed: {e}")
-        
-        return self.parse_standard_response(ai_content, url, tokens_used, cost)
+        return self.parse_ai_response(ai_content, url, "comprehensive", tokens_used, cost)
+    
+    def build_comprehensive_result(self, data, url, tokens_used, cost):
+        """Comprehensive analysis as returned by the AI, with extraction metadata added"""
+        data['extraction_metadata'] = {
+            'method': 'AI_Comprehensive',
+            'tokens_used': tokens_used,
+            'cost': cost,
+            'url': url,
+            'scraped_at': datetime.now().isoformat(),
+            'intelligence_level': 'comprehensive'
+        }
+        return data
     
-    def validate_url_batch(self, urls, max_workers=10):
-        """Quickly validate URLs in parallel to filter out broken ones before scraping"""
-        valid_urls = []
+    async def validate_url_batch(self, urls, concurrency=10):
+        """Quickly validate URLs concurrently to filter out broken ones before scraping"""
+        session = await self._http_session()
+        semaphore = asyncio.Semaphore(concurrency)
+        timeout = aiohttp.ClientTimeout(total=5)
         
-        def check_url(url):
+        async def probe(method, url):
+            """Status and content type from response headers only"""
+            async with session.request(method, url, timeout=timeout, allow_redirects=True) as response:
+                return response.status, response.headers.get('content-type', 'text/html')
+        
+        async def check_url(url):
             """Quick check if URL is accessible"""
             try:
-                # Use HEAD request for faster checking
-                response = self.session.head(url, timeout=5, allow_redirects=True)
-                if response.status_code == 200:
-                    return url
-            except:
-                pass
-            return None
+                async with semaphore:
+                    # Use HEAD request for faster checking
+                    status, content_type = await probe('HEAD', url)
+                    if status in HEAD_REJECTED_STATUSES:
+                        # Some servers refuse HEAD; a GET closed after the headers costs no body download
+                        status, content_type = await probe('GET', url)
+                if status != 200:
+                    return None
+                
+                # Drop PDFs and images before they are ever downloaded
+                if not content_type.startswith(HTML_CONTENT_TYPES):
+                    return None
+                return url
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                return None
         
         self.logger.info(f"🔍 Pre-validating {len(urls)} URLs to filter out broken ones...")
         
-        # Use ThreadPoolExecutor for parallel validation
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_url = {executor.submit(check_url, url): url for url in urls}
-            
-            for i, future in enumerate(as_completed(future_to_url), 1):
-                if i % 50 == 0 or i == len(urls):
-                    self.logger.info(f"   Validated {i}/{len(urls)} URLs...")
-                    
-                result = future.result()
-                if result:
-                    valid_urls.append(result)
+        checks = [asyncio.ensure_future(check_url(url)) for url in urls]
+        for i, check in enumerate(asyncio.as_completed(checks), 1):
+            await check
+            if i % 50 == 0 or i == len(urls):
+                self.logger.info(f"   Validated {i}/{len(urls)} URLs...")
+        
+        # Keep sitemap order (store pages first) whatever order the checks finished in
+        valid_urls = [check.result() for check in checks if check.result()]
         
-        self.logger.info(f"✅ Found {len(valid_urls)}/{len(urls)} valid URLs ({(len(valid_urls)/len(urls)*100):.1f}% success rate)")
+        if urls:
+            self.logger.info(f"✅ Found {len(valid_urls)}/{len(urls)} valid URLs ({(len(valid_urls)/len(urls)*100):.1f}% success rate)")
         return valid_urls
 
     def should_skip_url(self, url):
         """Check if URL should be skipped based on patterns that commonly fail"""
-        skip_patterns = [
-            '/notfound',
-            '/error',
-            '/404',
-            '/maintenance',
-            '.xml',
-            '.css',
-            '.js',
-            '.pdf',
-            '.jpg',
-            '.png',
-            '.gif',
-            '/api/',
-            '/admin/',
-            '/login',
-            '/logout',
-            '/search?',
-            '/category/',
-            '/tag/',
-            '/page/',
-            'javascript:',
-            'mailto:',
-            'tel:',
-            '#'
-        ]
-        
-        url_lower = url.lower()
-        
         # Check for skip patterns
-        for pattern in skip_patterns:
-            if pattern in url_lower:
-                return True
+        if _SKIP_URL_RE.search(url):
+            return True
         
         # Skip URLs that are too long (often dynamic/problematic)
         if len(url) > 200:
@@ -503,91 +1526,146 @@ Return detailed competitive analysis JSON:
             
         return False
     
-    def scrape_page(self, url, intelligence_level="standard", model_name="gpt-3.5-turbo", max_retries=2):
-        """Scrape a single page with specified intelligence level and model"""
+    async def scrape_page(self, session, url, intelligence_level="standard", model_name="gpt-4o-mini", max_retries=2):
+        """Scrape a single page with specified intelligence level and model, at most once per session"""
+        memo_key = (url, intelligence_level, model_name)
+        if memo_key in self._page_cache:
+            self.error_stats['page_cache_hits'] += 1
+            result = await asyncio.shield(self._page_cache[memo_key])
+            return self._as_free_result(result, "_Memo") if result else None
+        
+        memo = self._page_cache[memo_key] = asyncio.get_running_loop().create_future()
+        self._pages_in_flight += 1
+        try:
+            result = await self._scrape_page_uncached(session, url, intelligence_level, model_name, max_retries)
+        except BaseException:
+            # Cancelled or failed: let waiting duplicates go and a later call try again
+            del self._page_cache[memo_key]
+            memo.set_result(None)
+            raise
+        finally:
+            self._pages_in_flight -= 1
+        memo.set_result(result)
+        return result
+    
+    async def _scrape_page_uncached(self, session, url, intelligence_level, model_name, max_retries):
+        """Fetch and extract a single page"""
+        html = await self._fetch_page_html(session, url, intelligence_level, max_retries)
+        if html is None:
+            return None
+        
+        try:
+            # Basic level only needs merchant + rate, so try known selectors before spending tokens
+            result = None
+            if intelligence_level == "basic":
+                result = self.traditional_extract(html, url)
+                if result:
+                    self.error_stats['traditional_extractions'] += 1
+            
+            # Only call AI if we have valid content
+            if not result:
+                if intelligence_level in self.BATCH_PROMPTS and self.ai_batch_size > 1:
+                    result = await self.ai_extract_batched(html, url, model_name, intelligence_level)
+                else:
+                    result = await self.ai_extract(html, url, intelligence_level, model_name)
+            
+            if result:
+                self.error_stats['successful_extractions'] += 1
+                if self.logger.isEnabledFor(logging.INFO):
+                    merchant = result.get('merchant') or result.get('basic_info', {}).get('merchant_name', 'Unknown')
+                    tokens = result.get('tokens_used') or result.get('extraction_metadata', {}).get('tokens_used', 0)
+                    cost = result.get('cost') or result.get('extraction_metadata', {}).get('cost', 0)
+                    self.logger.info("✅ %s: %s [%s tokens, $%.4f]", intelligence_level.title(), merchant, tokens, cost)
+                return result
+            else:
+                self.error_stats['failed_extractions'] += 1
+                self.logger.warning(f"⚠️ No data extracted from {url}")
+                return None
+        except Exception as e:
+            self.logger.error(f"❌ Unexpected error scraping {url}: {e}")
+            return None
+    
+    async def _fetch_page_html(self, session, url, intelligence_level, max_retries):
+        """Fetch a merchant page's HTML, retrying transient failures; None when it should not be analysed"""
         
+        retry_delay = None  # Set when the server said how long to wait
         for attempt in range(max_retries + 1):
             try:
                 if attempt > 0:
-                    self.logger.info(f"Retry {attempt}/{max_retries} for {url}")
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                    self.logger.info("Retry %d/%d for %s", attempt, max_retries, url)
+                    await asyncio.sleep(2 ** attempt if retry_delay is None else retry_delay)  # Exponential backoff
+                    retry_delay = None
                 else:
-                    self.logger.info(f"Scraping ({intelligence_level}): {url}")
+                    self.logger.info("Scraping (%s): %s", intelligence_level, url)
                 
                 # Get the response but don't raise on HTTP errors yet
-                response = self.session.get(url, timeout=30)
+                async with self._host_limiters[urlparse(url).netloc], session.get(url) as response:
+                    status_code = response.status
+                    retry_after = response.headers.get('Retry-After', '')
+                    html = ""
+                    if status_code == 200:
+                        if "Content-Type" in response.headers and response.content_type not in HTML_CONTENT_TYPES:
+                            self.logger.warning(f"⚠️ Not an HTML page ({response.content_type}): {url} - Skipping AI analysis")
+                            return None
+                        body = bytearray()
+                        async for chunk in response.content.iter_chunked(65536):
+                            body += chunk
+                            if len(body) >= PAGE_READ_LIMIT:
+                                break  # The rest of the page is never analysed, so don't download it
+                        html = body[:PAGE_READ_LIMIT].decode(response.charset or "utf-8", errors="replace")
                 
                 # Check for common errors that should skip AI processing
-                if response.status_code == 404:
+                if status_code == 404:
                     self.logger.warning(f"⚠️ Page not found (404): {url} - Skipping AI analysis")
                     self.error_stats['404_errors'] += 1
                     return None
-                elif response.status_code == 403:
+                elif status_code == 403:
                     self.logger.warning(f"⚠️ Access forbidden (403): {url} - Skipping AI analysis")
                     self.error_stats['403_errors'] += 1
                     return None
-                elif response.status_code == 500:
-                    self.logger.warning(f"⚠️ Server error (500): {url} - Retrying..." if attempt < max_retries else f"⚠️ Server error (500): {url} - Skipping after retries")
-                    self.error_stats['500_errors'] += 1
+                elif status_code == 429:
+                    self.logger.warning(f"⚠️ Rate limited (429): {url} - Retrying..." if attempt < max_retries else f"⚠️ Rate limited (429): {url} - Skipping after retries")
                     if attempt < max_retries:
+                        # Honour the server's Retry-After (instead of the backoff) when it gives one in seconds
+                        retry_delay = min(int(retry_after), 60) if retry_after.isdigit() else 5
                         continue
                     return None
-                elif response.status_code == 429:
-                    self.logger.warning(f"⚠️ Rate limited (429): {url} - Retrying..." if attempt < max_retries else f"⚠️ Rate limited (429): {url} - Skipping after retries")
+                elif should_retry(status_code):
+                    self.logger.warning(f"⚠️ HTTP {status_code}: {url} - Retrying..." if attempt < max_retries else f"⚠️ HTTP {status_code}: {url} - Skipping after retries")
+                    if status_code == 500:
+                        self.error_stats['500_errors'] += 1
                     if attempt < max_retries:
-                        time.sleep(5)  # Extra delay for rate limiting
                         continue
                     return None
-                elif response.status_code != 200:
-                    self.logger.warning(f"⚠️ HTTP {response.status_code}: {url} - Skipping AI analysis")
+                elif status_code != 200:
+                    self.logger.warning(f"⚠️ HTTP {status_code}: {url} - Skipping AI analysis")
                     return None
                 
                 # Check if response has meaningful content
-                if len(response.text.strip()) < 100:
-                    self.logger.warning(f"⚠️ Response too short ({len(response.text)} chars): {url} - Skipping AI analysis")
+                if len(html.strip()) < 100:
+                    self.logger.warning(f"⚠️ Response too short ({len(html)} chars): {url} - Skipping AI analysis")
                     return None
                 
-                # Check for common error pages in content
-                    error_indicators = [
-                        '404', 'not found', 'page not found', 'error occurred', 'access denied',
-                        'store unavailable', 'not available', 'no longer available', 'currently unavailable',
-                        'this store is not available', 'store not found', 'shop unavailable', 'shop not found',
-                        'no longer exists', 'no longer active', 'inactive store', 'inactive shop', 'closed store', 'closed shop'
-                    ]
-                    content_lower = response.text.lower()
-                    if any(indicator in content_lower for indicator in error_indicators):
-                        self.logger.warning(f"⚠️ Error page detected: {url} - Skipping AI analysis")
-                        return None
-                
-                # Only call AI if we have valid content
-                result = self.ai_extract(response.text, url, intelligence_level, model_name)
-                
-                if result:
-                    merchant = result.get('merchant') or result.get('basic_info', {}).get('merchant_name', 'Unknown')
-                    tokens = result.get('tokens_used') or result.get('extraction_metadata', {}).get('tokens_used', 0)
-                    cost = result.get('cost') or result.get('extraction_metadata', {}).get('cost', 0)
-                    
-                    self.error_stats['successful_extractions'] += 1
-                    self.logger.info(f"✅ {intelligence_level.title()}: {merchant} [{tokens} tokens, ${cost:.4f}]")
-                    return result
-                else:
-                    self.error_stats['failed_extractions'] += 1
-                    self.logger.warning(f"⚠️ No data extracted from {url}")
+                # Check for common error pages in content (one case-insensitive scan of the page head)
+                if _ERROR_PAGE_RE.search(html, 0, ERROR_PROBE_CHARS):
+                    self.logger.warning(f"⚠️ Error page detected: {url} - Skipping AI analysis")
                     return None
+                
+                return html
                     
-            except requests.exceptions.Timeout:
+            except asyncio.TimeoutError:
                 self.error_stats['timeout_errors'] += 1
                 self.logger.warning(f"⚠️ Timeout accessing {url}" + (" - Retrying..." if attempt < max_retries else " - Skipping after retries"))
                 if attempt >= max_retries:
                     return None
                 continue
-            except requests.exceptions.ConnectionError:
+            except aiohttp.ClientConnectionError:
                 self.error_stats['connection_errors'] += 1
                 self.logger.warning(f"⚠️ Connection error accessing {url}" + (" - Retrying..." if attempt < max_retries else " - Skipping after retries"))
                 if attempt >= max_retries:
                     return None
                 continue
-            except requests.exceptions.RequestException as e:
+            except aiohttp.ClientError as e:
                 self.logger.warning(f"⚠️ Request error accessing {url}: {e}" + (" - Retrying..." if attempt < max_retries else " - Skipping after retries"))
                 if attempt >= max_retries:
                     return None
@@ -598,9 +1676,92 @@ Return detailed competitive analysis JSON:
         
         return None
     
-    def scrape_with_intelligence_level(self, site_name, intelligence_level="standard", model_name="gpt-3.5-turbo", max_pages=10, token_budget=None, retailer_list=None):
+    def iter_sitemap_urls(self, sitemap_url):
+        """Yield <loc> entries from a sitemap as they are parsed, without building the document tree"""
+        cache_key = ("sitemap", sitemap_url)
+        if self._content_cache is not None:
+            cached = self._content_cache.get(cache_key)
+            if cached is not None:
+                self.logger.info(f"Using cached sitemap: {sitemap_url}")
+                yield from cached
+                return
+        
+        self.logger.info(f"Fetching sitemap: {sitemap_url}")
+        urls = []
+        with self.session.get(sitemap_url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            source = gzip.GzipFile(fileobj=response.raw) if sitemap_url.endswith('.gz') else response.raw
+            
+            for _, loc in etree.iterparse(source, tag='{*}loc'):
+                if loc.text:
+                    url = loc.text.strip()
+                    urls.append(url)
+                    yield url
+                loc.clear()
+                entry = loc.getparent()
+                while entry is not None and entry.getprevious() is not None:
+                    del entry.getparent()[0]
+        
+        # Only a fully read sitemap is cached
+        if self._content_cache is not None:
+            self._content_cache.set(cache_key, urls, expire=SITEMAP_CACHE_EXPIRE)
+    
+    def scrape_with_intelligence_level(self, site_name, intelligence_level="standard", model_name="gpt-4o-mini", max_pages=10, token_budget=None, retailer_list=None, output_writer=None, keep_results=True):
         """Scrape with specified intelligence level, model, and budget control"""
+        return self.run_async(self.scrape_with_intelligence_level_async(
+            site_name, intelligence_level, model_name, max_pages, token_budget, retailer_list, output_writer, keep_results
+        ))
+    
+    async def scrape_with_intelligence_level_async(self, site_name, intelligence_level="standard", model_name="gpt-4o-mini", max_pages=10, token_budget=None, retailer_list=None, output_writer=None, keep_results=True):
+        """Async scrape_with_intelligence_level for callers that already run an event loop (keep_results=False: only stream to output_writer)"""
+        max_pages = self.pages_within_budget(intelligence_level, model_name, max_pages, token_budget)
+        
+        # Connect to the site (DNS, TCP, TLS) while the sitemap loads, so the first page skips the handshake
+        site = self.SITES.get(site_name.lower())
+        warmup = asyncio.ensure_future(self._prewarm_connection(site[1])) if site else None
+        
+        selected_urls = await self.select_site_urls_async(site_name, retailer_list)
+        if warmup:
+            await warmup
+        if selected_urls is None:
+            return []
+        
+        # Scrape pages concurrently until we get target number of results
+        target_results = max_pages
+        
+        self.logger.info(f"🎯 Target: {target_results} successful extractions with {intelligence_level} intelligence...")
+        self.logger.info(f"📝 Will process up to {len(selected_urls)} URLs until target is reached")
+        
+        results, result_count, tokens_used_session, processed_urls = await self._scrape_urls(
+            selected_urls, intelligence_level, model_name, target_results, token_budget, output_writer, keep_results
+        )
+        
+        # Check if we reached target or ran out of URLs
+        if result_count >= target_results:
+            self.logger.info(f"✅ {site_name} scraping complete! Successfully reached target: {result_count}/{target_results} results")
+        elif processed_urls >= len(selected_urls):
+            self.logger.warning(f"⚠️ {site_name} scraping complete but target not reached. Got {result_count}/{target_results} results after processing all {processed_urls} available URLs")
+        else:
+            self.logger.info(f"🎉 {site_name} scraping stopped. Found {result_count}/{target_results} results after processing {processed_urls} URLs")
+            
+        # Show efficiency stats
+        if processed_urls > 0:
+            success_rate = (result_count / processed_urls) * 100
+            self.logger.info(f"📈 Processing efficiency: {success_rate:.1f}% ({result_count} successes out of {processed_urls} attempts)")
+        
+        self.logger.info(f"💰 Session tokens used: {tokens_used_session}")
+        
+        if self._semantic_cache:
+            self._semantic_cache.save()
+        
+        # Display error statistics
+        self.display_error_stats(target_results, processed_urls)
         
+        return results
+    
+    def pages_within_budget(self, intelligence_level, model_name, max_pages, token_budget):
+        """Cap max_pages to what the token budget is expected to cover"""
         # Get cost estimate for the level+model combination
         estimated_cost_per_page = self.get_cost_estimate(intelligence_level, model_name)
         
@@ -612,116 +1773,304 @@ Return detailed competitive analysis JSON:
             self.logger.info(f"🤖 AI Model: {model_info['name']}")
             self.logger.info(f"💰 Budget: {token_budget} tokens (~${estimated_cost_per_page * max_pages:.3f})")
             self.logger.info(f"📊 Estimated pages: {max_pages}")
+        return max_pages
+    
+    def select_site_urls(self, site_name, retailer_list=None):
+        """Candidate merchant URLs for a site from its sitemap, filtered and validated (None on failure)"""
+        return self.run_async(self.select_site_urls_async(site_name, retailer_list))
+    
+    async def select_site_urls_async(self, site_name, retailer_list=None):
+        """Async select_site_urls: the sitemap is parsed in a worker thread, URLs are validated on the loop"""
+        candidate_urls = await asyncio.to_thread(self.candidate_site_urls, site_name, retailer_list)
+        if candidate_urls is None:
+            return None
+        
+        # Page fetches reject bad statuses and non-HTML themselves, so a HEAD pass costs an extra round trip per URL
+        if not self.prevalidate_urls:
+            self.logger.info(f"🎯 Ready to scrape {len(candidate_urls)} candidate URLs")
+            return candidate_urls
+        
+        # Second pass: validate URLs are actually accessible
+        selected_urls = await self.validate_url_batch(candidate_urls)
+        self.logger.info(f"🎯 Ready to scrape {len(selected_urls)} validated URLs")
+        return selected_urls
+    
+    def candidate_site_urls(self, site_name, retailer_list=None):
+        """Merchant URLs for a site from its sitemap after pattern filtering (None on failure)"""
         
         # Get sitemap URLs
-        if site_name.lower() == "shopback":
-            sitemap_url = "https://www.shopback.com.au/sitemap.xml"
-            base_url = "https://www.shopback.com.au"
-        elif site_name.lower() == "cashrewards":
-            sitemap_url = "https://www.cashrewards.com.au/en/sitemap.xml"
-            base_url = "https://www.cashrewards.com.au"
-        else:
+        if site_name.lower() not in self.SITES:
             self.logger.error(f"Unknown site: {site_name}")
-            return []
+            return None
+        sitemap_url, base_url = self.SITES[site_name.lower()]
         
         # Fetch and parse sitemap
         try:
-            self.logger.info(f"Fetching sitemap: {sitemap_url}")
-            response = self.session.get(sitemap_url, timeout=30)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'xml')
-            urls = [loc.get_text() for loc in soup.find_all('loc')]
-
-            # Filter for store/merchant pages
-            store_urls = [url for url in urls if '/store/' in url or any(keyword in url.lower() for keyword in ['shop', 'merchant', 'brand'])]
+            # Split store/merchant pages from the rest while the sitemap streams in
+            store_urls = []
+            other_urls = []
+            seen_pages = set()  # Sitemaps list some pages more than once ('/store/nike' and '/store/nike/')
+            for url in self.iter_sitemap_urls(sitemap_url):
+                page = _canonical_url(url)
+                if page in seen_pages:
+                    continue
+                seen_pages.add(page)
+                if '/store/' in url or any(keyword in url.lower() for keyword in ['shop', 'merchant', 'brand']):
+                    store_urls.append(url)
+                else:
+                    other_urls.append(url)
 
-            self.logger.info(f"Found {len(urls)} URLs, {len(store_urls)} store URLs")
+            self.logger.info(f"Found {len(store_urls) + len(other_urls)} URLs, {len(store_urls)} store URLs")
 
             # If retailer_list is provided, filter store_urls to only those matching retailer names
             if retailer_list:
-                print(f"[DEBUG] Target retailer_list: {retailer_list}")
+                self.logger.debug("Target retailer_list: %s", retailer_list)
                 from services.retailer_matcher import match_retailer
                 url_retailer_names = [url.split('/store/')[-1].replace('-', ' ').replace('_', ' ').split('/')[0] for url in store_urls]
-                print(f"[DEBUG] Extracted url_retailer_names: {url_retailer_names}")
-                matches = match_retailer(retailer_list, url_retailer_names, cutoff=0.6)
-                print(f"[DEBUG] Fuzzy matches: {matches}")
-                matched_urls = [url for url, name in zip(store_urls, url_retailer_names) if name in matches.values()]
+                self.logger.debug("Extracted url_retailer_names: %s", url_retailer_names)
+                matches = match_retailer(retailer_list, list(dict.fromkeys(url_retailer_names)), cutoff=0.6)
+                self.logger.debug("Fuzzy matches: %s", matches)
+                matched_names = frozenset(matches.values())
+                matched_urls = [url for url, name in zip(store_urls, url_retailer_names) if name in matched_names]
                 self.logger.info(f"Filtered to {len(matched_urls)} URLs matching top retailers")
                 if not matched_urls:
-                    print("[DEBUG] No matched URLs found for top retailers. Falling back to all store URLs.")
+                    self.logger.warning("No matched URLs found for top retailers. Falling back to all store URLs.")
                     all_candidate_urls = store_urls
                 else:
                     all_candidate_urls = matched_urls
             else:
                 # Use all available URLs - prioritize store URLs but include all for backup
-                all_candidate_urls = store_urls + [url for url in urls if url not in store_urls]
+                all_candidate_urls = store_urls + other_urls
 
             # First pass: filter out obviously bad URLs
             filtered_urls = [url for url in all_candidate_urls if not self.should_skip_url(url)]
             self.logger.info(f"📋 After pattern filtering: {len(filtered_urls)} candidate URLs")
 
-            # Second pass: validate URLs are actually accessible
-            selected_urls = self.validate_url_batch(filtered_urls)
-
-            self.logger.info(f"🎯 Ready to scrape {len(selected_urls)} validated URLs (will continue until {max_pages} successful results)")
-
         except Exception as e:
             self.logger.error(f"Error fetching sitemap: {e}")
-            return []
+            return None
         
-        # Scrape pages until we get target number of results
-        results = []
+        return filtered_urls
+    
+    async def _scrape_urls(self, urls, intelligence_level, model_name, target_results, token_budget=None, output_writer=None, keep_results=True):
+        """Scrape URLs concurrently, never keeping more pages in flight than are still needed"""
+        ordered_results = []
+        result_count = 0
         tokens_used_session = 0
         processed_urls = 0
-        target_results = max_pages
-        
-        self.logger.info(f"🎯 Target: {target_results} successful extractions with {intelligence_level} intelligence...")
-        self.logger.info(f"📝 Will process up to {len(selected_urls)} URLs until target is reached")
+        url_iter = enumerate(urls)
+        pending = set()
+        task_index = {}
         
-        for url in selected_urls:
-            # Check if we've reached our target
-            if len(results) >= target_results:
-                self.logger.info(f"🎯 Target reached! Got {len(results)}/{target_results} successful extractions")
-                break
-            
+        session = await self._http_session()
+        while True:
             # Check budget
-            if token_budget and tokens_used_session >= token_budget:
-                self.logger.warning(f"⚠️ Token budget reached ({tokens_used_session}/{token_budget}). Stopping with {len(results)}/{target_results} results.")
-                break
+            budget_reached = token_budget and tokens_used_session >= token_budget
             
-            processed_urls += 1
+            # Top up the window with as many pages as are still needed to reach the target
+            while not budget_reached and len(pending) < min(self.max_concurrency, target_results - result_count):
+                next_url = next(url_iter, None)
+                if next_url is None:
+                    break
+                index, url = next_url
+                processed_urls += 1
+                self.logger.info("Scraping (%d/%d): %s", result_count, target_results, url)
+                task = asyncio.ensure_future(self.scrape_page(session, url, intelligence_level, model_name))
+                task_index[task] = index
+                pending.add(task)
             
-            self.logger.info(f"Scraping ({len(results)}/{target_results}): {url}")
-            result = self.scrape_page(url, intelligence_level, model_name)
+            if not pending:
+                break
             
-            if result:
-                results.append(result)
-                
-                # Track tokens for budget
-                page_tokens = result.get('tokens_used') or result.get('extraction_metadata', {}).get('tokens_used', 0)
-                tokens_used_session += page_tokens
-                
-                # Brief pause between requests
-                time.sleep(1)
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result:
+                    result_count += 1
+                    if keep_results:
+                        ordered_results.append((task_index[task], result))
+                    if output_writer:
+                        output_writer.append(result)
+                    
+                    # Track tokens for budget
+                    page_tokens = result.get('tokens_used') or result.get('extraction_metadata', {}).get('tokens_used', 0)
+                    tokens_used_session += page_tokens
+            
+            if result_count >= target_results:
+                self.logger.info(f"🎯 Target reached! Got {result_count}/{target_results} successful extractions")
+                break
         
-        # Check if we reached target or ran out of URLs
-        if len(results) >= target_results:
-            self.logger.info(f"✅ {site_name} scraping complete! Successfully reached target: {len(results)}/{target_results} results")
-        elif processed_urls >= len(selected_urls):
-            self.logger.warning(f"⚠️ {site_name} scraping complete but target not reached. Got {len(results)}/{target_results} results after processing all {processed_urls} available URLs")
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        
+        if token_budget and tokens_used_session >= token_budget:
+            self.logger.warning(f"⚠️ Token budget reached ({tokens_used_session}/{token_budget}). Stopping with {result_count}/{target_results} results.")
+        
+        # Keep output in sitemap order regardless of completion order
+        ordered_results.sort(key=lambda item: item[0])
+        return [result for _, result in ordered_results], result_count, tokens_used_session, processed_urls
+    
+    async def _prewarm_connection(self, base_url):
+        """Leave a keep-alive connection to a site in the shared session's pool"""
+        try:
+            session = await self._http_session()
+            async with self._host_limiters[urlparse(base_url).netloc], session.head(f"{base_url}/robots.txt", allow_redirects=False) as response:
+                await response.release()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.debug(f"Connection warm-up failed for {base_url}: {e}")
+    
+    async def _http_session(self):
+        """Shared aiohttp session, so merchant connections stay alive across sites and runs"""
+        if self._http is None or self._http.closed:
+            self._http = self._client_session()
+        return self._http
+    
+    def _client_session(self):
+        """aiohttp session for merchant page fetches"""
+        try:
+            resolver = aiohttp.AsyncResolver()
+        except RuntimeError:
+            # aiodns not installed - fall back to the default threaded resolver
+            resolver = None
+        connector = aiohttp.TCPConnector(
+            limit=32,
+            limit_per_host=self.max_concurrency,
+            use_dns_cache=True,
+            ttl_dns_cache=3600,
+            resolver=resolver
+        )
+        # Unreachable hosts fail in seconds instead of using up the whole page timeout
+        timeout = aiohttp.ClientTimeout(total=30, sock_connect=5)
+        headers = {'User-Agent': self.session.headers['User-Agent'], 'Accept-Encoding': 'gzip, deflate, br'}
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
+    
+    def scrape_batch(self, site_name, intelligence_level="standard", model_name="gpt-4o-mini", max_pages=10, token_budget=None, retailer_list=None, poll_interval=60):
+        """Scrape through the OpenAI Batch API: half the token price, results within 24 hours
+        
+        The submitted batch is recorded under data/, so running again after an interruption
+        resumes waiting for it instead of paying for the same pages twice.
+        """
+        if not self.openai_client:
+            return []
+        
+        state_path = os.path.join(DATA_DIR, f"batch_{site_name.lower()}_{intelligence_level}_{model_name}.json")
+        
+        if os.path.exists(state_path):
+            with open(state_path, 'rb') as f:
+                state = orjson.loads(f.read())
+            self.logger.info(f"♻️ Resuming OpenAI batch {state['batch_id']} for {site_name}")
         else:
-            self.logger.info(f"🎉 {site_name} scraping stopped. Found {len(results)}/{target_results} results after processing {processed_urls} URLs")
+            max_pages = self.pages_within_budget(intelligence_level, model_name, max_pages, token_budget)
+            selected_urls = self.select_site_urls(site_name, retailer_list)
+            if selected_urls is None:
+                return []
+            state = self.run_async(self._submit_batch(selected_urls, intelligence_level, model_name, max_pages))
+            if state['batch_id']:
+                with open(state_path, 'wb') as f:
+                    f.write(orjson.dumps(state))
+        
+        results = self.run_async(self._collect_batch(state, intelligence_level, model_name, poll_interval))
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        
+        self.logger.info(f"✅ {site_name} batch complete: {len(results)} results, ${self.token_costs:.4f} at batch pricing")
+        submitted = len(state['pages']) + len(state['cached'])
+        self.display_error_stats(submitted, submitted)
+        return results
+    
+    async def _submit_batch(self, urls, intelligence_level, model_name, max_pages):
+        """Fetch and optimize pages until max_pages are ready, then upload the uncached ones as one batch"""
+        cached_results = []
+        pages = {}  # custom_id -> [url, optimized content]
+        url_iter = iter(urls)
+        
+        session = await self._http_session()
+        while len(cached_results) + len(pages) < max_pages:
+            window = list(islice(url_iter, self.max_concurrency))
+            if not window:
+                break
             
-        # Show efficiency stats
-        if processed_urls > 0:
-            success_rate = (len(results) / processed_urls) * 100
-            self.logger.info(f"📈 Processing efficiency: {success_rate:.1f}% ({len(results)} successes out of {processed_urls} attempts)")
+            htmls = await asyncio.gather(*(self._fetch_page_html(session, url, intelligence_level, 2) for url in window))
+            fetched = [(url, html) for url, html in zip(window, htmls) if html is not None]
+            optimized = await asyncio.gather(*(self.optimize_content_async(html, url) for url, html in fetched))
+            
+            for (url, _), (content, _) in zip(fetched, optimized):
+                if len(cached_results) + len(pages) >= max_pages:
+                    break
+                cached = self._get_cached_result(self._llm_cache_key(model_name, intelligence_level, url, content))
+                if cached:
+                    cached_results.append(cached)
+                else:
+                    pages[f"page-{len(pages)}"] = [url, content]
         
-        self.logger.info(f"💰 Session tokens used: {tokens_used_session}")
+        state = {"batch_id": None, "cached": cached_results, "pages": pages}
+        if not pages:
+            return state
         
-        # Display error statistics
-        self.display_error_stats(target_results, processed_urls)
+        lines = []
+        for custom_id, (url, content) in pages.items():
+            _, request = self.build_chat_request(content, url, intelligence_level, model_name)
+            lines.append(orjson.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": request}))
+        
+        batch_file = await self.openai_client.files.create(file=("batch.jsonl", b"\n".join(lines)), purpose="batch")
+        batch = await self.openai_client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        state["batch_id"] = batch.id
+        self.logger.info(f"📤 Submitted {len(pages)} pages as OpenAI batch {batch.id} ({len(cached_results)} served from cache)")
+        return state
+    
+    async def _collect_batch(self, state, intelligence_level, model_name, poll_interval):
+        """Wait for a submitted batch and parse its responses in page order"""
+        results = list(state["cached"])
+        if not state["batch_id"]:
+            return results
+        
+        while True:
+            batch = await self.openai_client.batches.retrieve(state["batch_id"])
+            if batch.status in ("completed", "failed", "expired", "cancelled"):
+                break
+            counts = batch.request_counts
+            self.logger.info(f"⏳ Batch {batch.id} {batch.status}: {counts.completed if counts else 0}/{counts.total if counts else '?'} done")
+            await asyncio.sleep(poll_interval)
+        
+        if not batch.output_file_id:
+            self.logger.error(f"❌ Batch {batch.id} {batch.status} without output")
+            self.error_stats['failed_extractions'] += len(state["pages"])
+            return results
+        
+        output = await self.openai_client.files.content(batch.output_file_id)
+        responses = {}
+        for line in output.content.splitlines():
+            if line.strip():
+                entry = orjson.loads(line)
+                responses[entry["custom_id"]] = entry.get("response") or {}
+        
+        for custom_id, (url, content) in state["pages"].items():
+            response = responses.get(custom_id, {})
+            if response.get("status_code") != 200:
+                self.error_stats['failed_extractions'] += 1
+                self.logger.warning(f"⚠️ No batch response for {url}")
+                continue
+            
+            body = response["body"]
+            usage = body["usage"]
+            cost = self.calculate_dynamic_cost(intelligence_level, model_name, usage["prompt_tokens"], usage["completion_tokens"]) * BATCH_API_DISCOUNT
+            self.total_tokens_used += usage["total_tokens"]
+            self.total_api_calls += 1
+            self.token_costs += cost
+            
+            ai_content = body["choices"][0]["message"]["content"].strip()
+            result = self.parse_ai_response(ai_content, url, intelligence_level, usage["total_tokens"], cost)
+            if result:
+                self._store_cached_result(self._llm_cache_key(model_name, intelligence_level, url, content), result)
+                self.error_stats['successful_extractions'] += 1
+                results.append(result)
+            else:
+                self.error_stats['failed_extractions'] += 1
         
         return results
     
@@ -761,200 +2110,176 @@ Return detailed competitive analysis JSON:
                 self.logger.info(f"   🔌 Connection errors: {stats['connection_errors']}")
             if stats['failed_extractions'] > 0:
                 self.logger.info(f"   ❌ Failed extractions: {stats['failed_extractions']}")
+            if stats['traditional_extractions'] > 0:
+                self.logger.info(f"   🧩 Selector extractions (AI skipped): {stats['traditional_extractions']}")
+            if stats['cached_extractions'] > 0:
+                self.logger.info(f"   💾 Cached AI extractions: {stats['cached_extractions']}")
+            if stats['semantic_cache_hits'] > 0:
+                self.logger.info(f"   🧠 Near-duplicate pages analysed at basic cost: {stats['semantic_cache_hits']}")
+            if stats['template_extractions'] > 0:
+                self.logger.info(f"   📐 Template pages analysed at basic cost: {stats['template_extractions']}")
+            if stats['page_cache_hits'] > 0:
+                self.logger.info(f"   ♻️ Repeated pages served from memory: {stats['page_cache_hits']}")
+            if stats['routed_pages'] > 0:
+                self.logger.info(f"   🔀 Simple pages sent to {SIMPLE_PAGE_MODEL}: {stats['routed_pages']}")
+            if stats['duplicate_content_hits'] > 0:
+                self.logger.info(f"   🪞 Identical content under another URL: {stats['duplicate_content_hits']}")
+            if stats['cached_prompt_tokens'] > 0:
+                self.logger.info(f"   🗄️ Prompt tokens served from OpenAI's cache: {stats['cached_prompt_tokens']}")
     
     def save_intelligence_results(self, results, site_name, intelligence_level, retailer_scores=None):
-        """Save results to CSV or JSON based on intelligence level"""
+        """Save results as CSV plus a gzipped JSON backup and a cost summary"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        data_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
-        os.makedirs(data_dir, exist_ok=True)
-        if intelligence_level == "comprehensive":
-            csv_file = os.path.join(data_dir, f"{site_name}_comprehensive_{timestamp}.csv")
-            json_file = os.path.join(data_dir, f"{site_name}_comprehensive_{timestamp}.json")
-            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                fieldnames = [
-                    'merchant_name', 'cashback_offer', 'offer_type',
-                    'market_position', 'unique_selling_points', 'competitive_advantages', 'weaknesses_pokitpal_can_exploit',
-                    'offer_attractiveness', 'offer_complexity', 'pokitpal_differentiation_opportunity',
-                    'special_conditions', 'exclusions',
-                    'ease_of_use', 'signup_process', 'payment_methods', 'mobile_optimized', 'pokitpal_ux_advantages',
-                    'threat_to_pokitpal', 'partnership_opportunity', 'market_share_vulnerability', 'customer_acquisition_difficulty',
-                    'pokitpal_recommendation_1', 'pokitpal_recommendation_2', 'pokitpal_recommendation_3',
-                    'overall_threat_level', 'pokitpal_response_priority', 'recommended_pokitpal_strategy',
-                    'extraction_confidence', 'data_completeness', 'analysis_reliability',
-                    'tokens_used', 'cost', 'url', 'scraped_at'
-                ]
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                for result in results:
-                    writer.writerow(self.flatten_comprehensive_competitive_data(result))
-        
-        else:  # comprehensive - NOW SAVES AS CSV TOO!
-            # Create comprehensive CSV with flattened competitive intelligence data
-            data_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
-            os.makedirs(data_dir, exist_ok=True)
-            csv_file = os.path.join(data_dir, f"{site_name}_{intelligence_level}_{timestamp}.csv")
-            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                if results:
-                    # Define comprehensive fieldnames for competitive intelligence
-                    fieldnames = [
-                        'merchant_name', 'cashback_offer', 'offer_type',
-                        'market_position', 'unique_selling_points', 'competitive_advantages', 'weaknesses_pokitpal_can_exploit',
-                        'offer_attractiveness', 'offer_complexity', 'pokitpal_differentiation_opportunity',
-                        'special_conditions', 'exclusions',
-                        'ease_of_use', 'signup_process', 'payment_methods', 'mobile_optimized', 'pokitpal_ux_advantages',
-                        'threat_to_pokitpal', 'partnership_opportunity', 'market_share_vulnerability', 'customer_acquisition_difficulty',
-                        'pokitpal_recommendation_1', 'pokitpal_recommendation_2', 'pokitpal_recommendation_3',
-                        'overall_threat_level', 'pokitpal_response_priority', 'recommended_pokitpal_strategy',
-                        'extraction_confidence', 'data_completeness', 'analysis_reliability',
-                        'tokens_used', 'cost', 'url', 'scraped_at'
-                    ]
-                    
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-                    
-                    for result in results:
-                        flattened = self.flatten_comprehensive_competitive_data(result)
-                        writer.writerow(flattened)
-            
-            # Also save JSON for backup/detailed analysis
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
+        csv_file = os.path.join(DATA_DIR, f"{site_name}_{intelligence_level}_{timestamp}.csv")
+        json_file = os.path.join(DATA_DIR, f"{site_name}_{intelligence_level}_{timestamp}.json.gz")
+        
+        # One streamed pass: flat levels are written as-is, comprehensive results are flattened row by row
+        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+            fieldnames, rows = self.csv_rows(results, intelligence_level)
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        
+        # Also save JSON for backup/detailed analysis - one dump, fast gzip (comprehensive runs get large)
+        with gzip.open(json_file, 'wb', compresslevel=1) as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_APPEND_NEWLINE))
         
         # Always create a summary
+        summary_file = self.save_run_summary(site_name, intelligence_level, len(results), timestamp)
+
+        self.logger.info(f"💾 Results saved:")
+        self.logger.info(f"   📊 CSV Data: {csv_file}")
+        self.logger.info(f"   📄 JSON Backup: {json_file}")
+        self.logger.info(f"   📈 Summary: {summary_file}")
+        self.logger.info(f"   💰 Total cost: ${self.token_costs:.4f}")
+    
+    def save_run_summary(self, site_name, intelligence_level, result_count, timestamp=None):
+        """Write the run's token and cost summary JSON and return its path"""
+        timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
         cost_summary = {
             "analysis_summary": {
                 "intelligence_level": intelligence_level,
-                "total_results": len(results),
+                "total_results": result_count,
                 "total_tokens_used": self.total_tokens_used,
                 "total_api_calls": self.total_api_calls,
                 "total_cost": round(self.token_costs, 4),
-                "average_cost_per_result": round(self.token_costs / len(results), 4) if results else 0,
+                "average_cost_per_result": round(self.token_costs / result_count, 4) if result_count else 0,
                 "timestamp": timestamp,
                 "competitive_analysis_for": "Pokitpal"
             }
         }
-        summary_file = os.path.join(data_dir, f"{site_name}_{intelligence_level}_summary_{timestamp}.json")
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(cost_summary, f, indent=2)
-
-        self.logger.info(f"💾 Results saved:")
-        if intelligence_level == "comprehensive":
-            self.logger.info(f"   📊 CSV Data: {csv_file}")
-            self.logger.info(f"   📄 JSON Backup: {json_file}")
-        else:
-            csv_file = os.path.join(data_dir, f"{site_name}_{intelligence_level}_{timestamp}.csv")
-            json_file = os.path.join(data_dir, f"{site_name}_{intelligence_level}_{timestamp}.json")
-            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                fieldnames = [
-                    'merchant_name', 'cashback_offer', 'offer_type',
-                    'market_position', 'unique_selling_points', 'competitive_advantages', 'weaknesses_pokitpal_can_exploit',
-                    'offer_attractiveness', 'offer_complexity', 'pokitpal_differentiation_opportunity',
-                    'special_conditions', 'exclusions',
-                    'ease_of_use', 'signup_process', 'payment_methods', 'mobile_optimized', 'pokitpal_ux_advantages',
-                    'threat_to_pokitpal', 'partnership_opportunity', 'market_share_vulnerability', 'customer_acquisition_difficulty',
-                    'pokitpal_recommendation_1', 'pokitpal_recommendation_2', 'pokitpal_recommendation_3',
-                    'overall_threat_level', 'pokitpal_response_priority', 'recommended_pokitpal_strategy',
-                    'extraction_confidence', 'data_completeness', 'analysis_reliability',
-                    'tokens_used', 'cost', 'url', 'scraped_at'
-                ]
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                for result in results:
-                    writer.writerow(self.flatten_comprehensive_competitive_data(result))
-        self.logger.info(f"   📈 Summary: {summary_file}")
-        self.logger.info(f"   💰 Total cost: ${self.token_costs:.4f}")
+        summary_file = os.path.join(DATA_DIR, f"{site_name}_{intelligence_level}_summary_{timestamp}.json")
+        with open(summary_file, 'wb') as f:
+            f.write(orjson.dumps(cost_summary, option=orjson.OPT_INDENT_2))
+        return summary_file
+    
+    def csv_rows(self, results, intelligence_level):
+        """CSV fieldnames and rows for results of one level (flat levels are written without copying)"""
+        if intelligence_level in RESULT_FIELDNAMES:
+            return RESULT_FIELDNAMES[intelligence_level], results
+        return COMPREHENSIVE_FIELDNAMES, map(self.flatten_comprehensive_competitive_data, results)
     
     def flatten_comprehensive_competitive_data(self, result):
         """Flatten comprehensive competitive intelligence data for CSV export"""
         
-        basic_info = result.get('basic_info', {})
-        competitive = result.get('competitive_positioning', {})
-        offer_intel = result.get('offer_intelligence', {})
-        user_exp = result.get('user_experience', {})
-        strategic = result.get('strategic_insights', {})
-        recommendations = result.get('pokitpal_strategic_recommendations', [])
-        summary = result.get('competitive_summary', {})
-        data_quality = result.get('data_quality', {})
-        metadata = result.get('extraction_metadata', {})
+        row = {}
+        for section_name, columns, list_columns in COMPREHENSIVE_SECTION_COLUMNS:
+            section = result.get(section_name) or _EMPTY
+            for column in columns:
+                row[column] = section.get(column, '')
+            for column in list_columns:
+                row[column] = _join(section.get(column) or ())
         
-        return {
-            'merchant_name': basic_info.get('merchant_name', ''),
-            'cashback_offer': basic_info.get('cashback_offer', ''),
-            'offer_type': basic_info.get('offer_type', ''),
-            
-            'market_position': competitive.get('market_position', ''),
-            'unique_selling_points': '; '.join(competitive.get('unique_selling_points', [])),
-            'competitive_advantages': '; '.join(competitive.get('competitive_advantages', [])),
-            'weaknesses_pokitpal_can_exploit': '; '.join(competitive.get('weaknesses_pokitpal_can_exploit', [])),
-            
-            'offer_attractiveness': offer_intel.get('offer_attractiveness', ''),
-            'offer_complexity': offer_intel.get('offer_complexity', ''),
-            'pokitpal_differentiation_opportunity': offer_intel.get('pokitpal_differentiation_opportunity', ''),
-            'special_conditions': '; '.join(offer_intel.get('special_conditions', [])),
-            'exclusions': '; '.join(offer_intel.get('exclusions', [])),
-            
-            'ease_of_use': user_exp.get('ease_of_use', ''),
-            'signup_process': user_exp.get('signup_process', ''),
-            'payment_methods': '; '.join(user_exp.get('payment_methods', [])),
-            'mobile_optimized': user_exp.get('mobile_optimized', ''),
-            'pokitpal_ux_advantages': '; '.join(user_exp.get('pokitpal_ux_advantages', [])),
-            
-            'threat_to_pokitpal': strategic.get('threat_to_pokitpal', ''),
-            'partnership_opportunity': strategic.get('partnership_opportunity', ''),
-            'market_share_vulnerability': strategic.get('market_share_vulnerability', ''),
-            'customer_acquisition_difficulty': strategic.get('customer_acquisition_difficulty', ''),
-            
-            'pokitpal_recommendation_1': recommendations[0] if len(recommendations) > 0 else '',
-            'pokitpal_recommendation_2': recommendations[1] if len(recommendations) > 1 else '',
-            'pokitpal_recommendation_3': recommendations[2] if len(recommendations) > 2 else '',
-            
-            'overall_threat_level': summary.get('overall_threat_level', ''),
-            'pokitpal_response_priority': summary.get('pokitpal_response_priority', ''),
-            'recommended_pokitpal_strategy': summary.get('recommended_pokitpal_strategy', ''),
-            
-            'extraction_confidence': data_quality.get('extraction_confidence', ''),
-            'data_completeness': data_quality.get('data_completeness', ''),
-            'analysis_reliability': data_quality.get('analysis_reliability', ''),
-            
-            'tokens_used': metadata.get('tokens_used', ''),
-            'cost': metadata.get('cost', ''),
-            'url': metadata.get('url', ''),
-            'scraped_at': metadata.get('scraped_at', '')
-        }
+        recommendations = result.get('pokitpal_strategic_recommendations') or ()
+        for i, column in enumerate(RECOMMENDATION_COLUMNS):
+            row[column] = recommendations[i] if i < len(recommendations) else ''
+        
+        row.update(zip(DATA_QUALITY_FIELDS, _section_values(
+            _DATA_QUALITY_GETTER, DATA_QUALITY_FIELDS, result.get('data_quality') or _EMPTY)))
+        row.update(zip(METADATA_FIELDS, _section_values(
+            _METADATA_GETTER, METADATA_FIELDS, result.get('extraction_metadata') or _EMPTY)))
+        return row
 
-def main():
-    """Demo function showing intelligence levels"""
-    print("🚀 Token-Optimized AI Scraper with Intelligence Levels")
-    print("=" * 60)
-    
-    scraper = TokenOptimizedAIScraper()
+
+class IntelligenceResultWriter:
+    """Append scrape results to CSV and JSON Lines files as they arrive"""
     
-    print("\n🧠 Choose Intelligence Level:")
-    print("1. 🔸 Basic - Simple extraction (~$0.0008/page)")
-    print("2. 🔹 Standard - Business insights (~$0.0015/page)")  
-    print("3. 🔷 Comprehensive - Full analysis (~$0.0035/page)")
+    def __init__(self, scraper, site_name, intelligence_level, data_dir=None):
+        self.scraper = scraper
+        self.intelligence_level = intelligence_level
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if data_dir:
+            os.makedirs(data_dir, exist_ok=True)
+        else:
+            data_dir = DATA_DIR
+        self.csv_file = os.path.join(data_dir, f"{site_name}_{intelligence_level}_{timestamp}_stream.csv")
+        self.jsonl_file = os.path.join(data_dir, f"{site_name}_{intelligence_level}_{timestamp}_stream.jsonl")
+        self.count = 0
+        self.cost = 0.0  # Cost of the results written, summed as they arrive
     
-    choice = input("\nEnter choice (1-3): ").strip()
+    def __enter__(self):
+        self._csv = open(self.csv_file, 'w', newline='', encoding='utf-8')
+        self._jsonl = open(self.jsonl_file, 'wb')
+        fieldnames = RESULT_FIELDNAMES.get(self.intelligence_level, COMPREHENSIVE_FIELDNAMES)
+        self._writer = csv.DictWriter(self._csv, fieldnames=fieldnames, extrasaction='ignore')
+        self._writer.writeheader()
+        return self
     
-    levels = {"1": "basic", "2": "standard", "3": "comprehensive"}
-    intelligence_level = levels.get(choice, "standard")
+    def append(self, result):
+        """Write one result and flush so it survives a crash"""
+        _, rows = self.scraper.csv_rows((result,), self.intelligence_level)
+        self._writer.writerows(rows)
+        self._jsonl.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
+        self._csv.flush()
+        self._jsonl.flush()
+        self.count += 1
+        self.cost += result.get('cost') or result.get('extraction_metadata', {}).get('cost', 0)
     
-    print(f"\n🎯 Selected: {intelligence_level.title()} Intelligence")
+    def __exit__(self, exc_type, exc, tb):
+        self._csv.close()
+        self._jsonl.close()
+        self.scraper.logger.info(f"💾 Streamed {self.count} results to {self.csv_file} and {self.jsonl_file}")
+        return False
+
+
+async def main(argv=None):
+    """Demo showing intelligence levels"""
+    parser = argparse.ArgumentParser(description="Token-Optimized AI Scraper with Intelligence Levels")
+    parser.add_argument("--level", choices=["basic", "standard", "comprehensive"], default="standard",
+                        help="basic (~$0.0001/page), standard (~$0.0003/page) or comprehensive (~$0.0008/page)")
+    parser.add_argument("--site", choices=["shopback", "cashrewards"], default="shopback")
+    parser.add_argument("--pages", "--max-pages", dest="pages", type=int, default=3)
+    parser.add_argument("--budget", type=int, default=2000, help="token budget")
+    args = parser.parse_args(argv)
     
-    # Demo with ShopBack
-    results = scraper.scrape_with_intelligence_level(
-        site_name="shopback",
-        intelligence_level=intelligence_level,
-        max_pages=3,
-        token_budget=2000
-    )
+    print("🚀 Token-Optimized AI Scraper with Intelligence Levels")
+    print("=" * 60)
+    print(f"\n🎯 Selected: {args.level.title()} Intelligence")
     
-    if results:
-        scraper.save_intelligence_results(results, f"demo_{intelligence_level}", intelligence_level)
-        print(f"\n✅ Demo complete! {len(results)} results saved")
-        print(f"💰 Total cost: ${scraper.token_costs:.4f}")
-    else:
-        print("\n❌ No results obtained")
+    scraper = TokenOptimizedAIScraper()
+    try:
+        # Write each result to disk as soon as it is extracted, without holding the whole run in memory
+        with IntelligenceResultWriter(scraper, f"demo_{args.level}", args.level) as writer:
+            await scraper.scrape_with_intelligence_level_async(
+                site_name=args.site,
+                intelligence_level=args.level,
+                max_pages=args.pages,
+                token_budget=args.budget,
+                output_writer=writer,
+                keep_results=False
+            )
+        
+        if writer.count:
+            await asyncio.to_thread(scraper.save_run_summary, f"demo_{args.level}", args.level, writer.count)
+            print(f"\n✅ Demo complete! {writer.count} results saved")
+            # Summed from the per-page records as they were written; token_costs also counts calls that produced no result
+            print(f"💰 Total cost: ${writer.cost:.4f} for these results (${scraper.token_costs:.4f} API spend)")
+        else:
+            print("\n❌ No results obtained")
+    finally:
+        # Release sessions, worker processes and caches even when the run fails
+        await scraper.aclose()
+        scraper.close()
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
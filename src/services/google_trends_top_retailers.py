@@ -1,14 +1,46 @@
 import csv
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pytrends.request import TrendReq
 from services.retailer_scraper import scrape_shopback_retailers, scrape_cashrewards_retailers
 
+# Trend rankings move slowly; a saved ranking younger than this is reused instead of querying pytrends
+TOP_RETAILERS_TTL = 6 * 3600
+
+logger = logging.getLogger(__name__)
+
+# Saved rankings live in the project's data folder
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+# Concurrent pytrends batches; kept low to stay under Google's per-IP rate limit
+TRENDS_WORKERS = 4
+
+def load_cached_top_retailers(csv_path, region, top_n):
+    """Return the saved ranking if it is fresh, for this region and long enough, else None"""
+    if not os.path.exists(csv_path) or os.path.getmtime(csv_path) < time.time() - TOP_RETAILERS_TTL:
+        return None
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    if len(rows) < top_n or any(row.get('region') != region for row in rows):
+        return None
+    return [row['retailer'] for row in rows[:top_n]]
+
 def fetch_top_retailers(region='AU', top_n=20, filename='top_retailers.csv'):
+    csv_path = os.path.join(DATA_DIR, filename)
+    cached = load_cached_top_retailers(csv_path, region, top_n)
+    if cached:
+        print(f"Using top {top_n} {region} retailers saved at {csv_path}")
+        return cached
+
     # Get dynamic retailer names
     shopback = scrape_shopback_retailers()
     cashrewards = scrape_cashrewards_retailers()
-    print(f"ShopBack retailers found: {shopback}")
-    print(f"Cashrewards retailers found: {cashrewards}")
+    logger.debug("ShopBack retailers found: %s", shopback)
+    logger.debug("Cashrewards retailers found: %s", cashrewards)
+    print(f"ShopBack retailers found: {len(shopback)}, Cashrewards retailers found: {len(cashrewards)}")
     all_retailers = list(set(shopback + cashrewards))
     print(f"Total unique retailers: {len(all_retailers)}")
 
@@ -18,15 +50,25 @@ def fetch_top_retailers(region='AU', top_n=20, filename='top_retailers.csv'):
 
     # Batch into groups of 5 for pytrends
     batch_size = 5
-    interest_scores = {}
-    pytrends = TrendReq(hl='en-US', tz=360)
-    for i in range(0, len(all_retailers), batch_size):
-        batch = all_retailers[i:i+batch_size]
+    batches = [all_retailers[i:i+batch_size] for i in range(0, len(all_retailers), batch_size)]
+
+    def fetch_batch(batch):
+        # TrendReq is not thread-safe, so each batch gets its own (retries back off on 429s)
         print(f"Processing batch: {batch}")
         try:
+            pytrends = TrendReq(hl='en-US', tz=360, retries=2, backoff_factor=0.5)
             pytrends.build_payload(batch, cat=0, timeframe='now 7-d', geo=region, gprop='')
-            trends = pytrends.interest_over_time()
-            print(f"Pytrends result for batch: {trends}")
+            return batch, pytrends.interest_over_time()
+        except Exception as e:
+            print(f"Batch {batch} failed: {e}")
+            return batch, None
+
+    interest_scores = {}
+    with ThreadPoolExecutor(max_workers=TRENDS_WORKERS) as executor:
+        for batch, trends in executor.map(fetch_batch, batches):
+            if trends is None:
+                continue
+            logger.debug("Pytrends result for batch: %s", trends)
             if not trends.empty:
                 for retailer in batch:
                     if retailer in trends:
@@ -34,9 +76,6 @@ def fetch_top_retailers(region='AU', top_n=20, filename='top_retailers.csv'):
                         interest_scores[retailer] = avg_score
             else:
                 print(f"No trend data for batch: {batch}")
-        except Exception as e:
-            print(f"Batch {batch} failed: {e}")
-            continue
 
     if not interest_scores:
         print("No interest scores found for any retailer. Exiting.")
@@ -47,15 +86,12 @@ def fetch_top_retailers(region='AU', top_n=20, filename='top_retailers.csv'):
     top_retailers = [r[0] for r in ranked[:top_n]]
 
     # Save to CSV (overwrite) in data folder
-    import os
-    data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
-    os.makedirs(data_dir, exist_ok=True)
-    csv_path = os.path.join(data_dir, filename)
+    os.makedirs(DATA_DIR, exist_ok=True)
     with open(csv_path, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
-        writer.writerow(['retailer', 'score', 'timestamp'])
+        writer.writerow(['retailer', 'score', 'timestamp', 'region'])
         for retailer in top_retailers:
-            writer.writerow([retailer, interest_scores.get(retailer, 0), datetime.now().isoformat()])
+            writer.writerow([retailer, interest_scores.get(retailer, 0), datetime.now().isoformat(), region])
     print(f"Saved top {top_n} retailers to {csv_path}")
     return top_retailers
 
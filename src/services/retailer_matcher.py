@@ -7,13 +7,20 @@ def match_retailer(trends_list, cashback_list, cutoff=0.7):
     """
     matches = {}
     cashback_names = [name.lower().strip() for name in cashback_list]
+    # Normalized name -> original cashback name (first one wins, as list.index did)
+    originals = {}
+    for norm, name in zip(cashback_names, cashback_list):
+        originals.setdefault(norm, name)
     for retailer in trends_list:
         retailer_norm = retailer.lower().strip()
+        if retailer_norm in originals:
+            # Exact match is always the best match; skip the fuzzy scan
+            matches[retailer] = originals[retailer_norm]
+            continue
         found = difflib.get_close_matches(retailer_norm, cashback_names, n=1, cutoff=cutoff)
         if found:
             # Return the original cashback name (not normalized)
-            idx = cashback_names.index(found[0])
-            matches[retailer] = cashback_list[idx]
+            matches[retailer] = originals[found[0]]
         else:
             matches[retailer] = None
     return matches
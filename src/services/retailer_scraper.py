@@ -1,10 +1,13 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Only store links are read from the all-stores page, so build nothing else
+STORE_LINKS = SoupStrainer("a", href=True)
 
 def scrape_shopback_retailers():
     url = "https://www.shopback.com.au"
     response = requests.get(url, timeout=20)
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(response.text, "lxml")
     retailers = set()
     # Find Popular Stores section by heading
     popular_heading = soup.find(lambda tag: tag.name == "h3" and "Popular Stores" in tag.text)
@@ -25,7 +28,7 @@ def scrape_shopback_retailers():
 def scrape_cashrewards_retailers():
     url = "https://www.cashrewards.com.au/all-stores"
     response = requests.get(url, timeout=20)
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(response.text, "lxml", parse_only=STORE_LINKS)
     retailers = set()
     # Find all <a> tags where href contains /store/
     for a in soup.find_all("a", href=True):
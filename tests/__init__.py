@@ -4,4 +4,7 @@ Tests Package
 
 This package contains test modules:
 - test_api_key: OpenAI API key testing and validation
+- test_custom_ai_agents: Rule-based custom agents on small pages
+- test_retailer_matcher: Matching trending retailers to cashback site names
+- test_token_optimized_scraper: Batch extraction, AI reply parsing and CSV export
 """
@@ -0,0 +1,37 @@
+"""
+Retailer Matcher Tests - mapping Google Trends names onto cashback site names
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.retailer_matcher import match_retailer
+
+
+def test_fuzzy_and_exact_matches():
+    trends = ['Woolworths', 'Kmart', 'Amazon', 'Chemist Warehouse', 'Big W']
+    cashback = ['Woolworths Group', 'Kmart Australia', 'Amazon AU', 'Chemist Warehouse', 'BIG W']
+
+    assert match_retailer(trends, cashback) == {
+        'Woolworths': 'Woolworths Group',
+        'Kmart': None,
+        'Amazon': 'Amazon AU',
+        'Chemist Warehouse': 'Chemist Warehouse',
+        'Big W': 'BIG W',
+    }
+
+
+def test_exact_match_returns_first_original_name():
+    """Names that normalize alike resolve to the first one listed"""
+    assert match_retailer(['nike'], ['Nike ', 'NIKE', 'Nike Store']) == {'nike': 'Nike '}
+
+
+def test_cutoff_controls_fuzzy_matches():
+    assert match_retailer(['Kmart'], ['Kmart Australia'], cutoff=0.7) == {'Kmart': None}
+    assert match_retailer(['Kmart'], ['Kmart Australia'], cutoff=0.4) == {'Kmart': 'Kmart Australia'}
+
+
+def test_no_candidates():
+    assert match_retailer(['Nike'], []) == {'Nike': None}
@@ -0,0 +1,150 @@
+"""
+Token Optimized Scraper Tests - batching, reply parsing and CSV export (no API calls)
+"""
+
+import asyncio
+import os
+import re
+import sys
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from scrapers.token_optimized_scraper_v2 import (
+    COMPREHENSIVE_FIELDNAMES, RESULT_FIELDNAMES, TokenOptimizedAIScraper, _extract_json
+)
+
+
+async def close_client():
+    """Stand-in for AsyncOpenAI.close"""
+
+
+class FakeCompletions:
+    """Chat completions that answer every page of a batch, truncating batches above max_items"""
+
+    def __init__(self, max_items=None):
+        self.max_items = max_items
+        self.batch_sizes = []
+
+    async def create(self, **request):
+        urls = re.findall(r'^URL: (\S+)$', request["messages"][1]["content"], re.M)
+        self.batch_sizes.append(len(urls))
+        truncated = self.max_items is not None and len(urls) > self.max_items
+        results = [{"index": i, "merchant_name": url.rsplit('/', 1)[-1], "cashback_offer": f"{i + 1}%"}
+                   for i, url in enumerate(urls)]
+        return SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20, total_tokens=120, prompt_tokens_details=None),
+            choices=[SimpleNamespace(
+                finish_reason="length" if truncated else "stop",
+                message=SimpleNamespace(content='{"results": [' if truncated else orjson.dumps({"results": results}).decode())
+            )]
+        )
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    """Scraper whose caches and logs live in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'logs').mkdir()
+    scraper = TokenOptimizedAIScraper()
+    yield scraper
+    scraper.close()
+
+
+def run_batch(scraper, completions, urls, intelligence_level="basic"):
+    """Send urls through ai_extract_batch and return each page's result"""
+    scraper.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=completions), close=close_client)
+
+    async def batch():
+        loop = asyncio.get_running_loop()
+        items = [(url, f"content of {url}", "gpt-4o-mini", loop.create_future()) for url in urls]
+        await scraper.ai_extract_batch(items, intelligence_level)
+        return [future.result() for _, _, _, future in items]
+
+    return scraper.run_async(batch())
+
+
+def test_batch_results_map_to_their_pages(scraper):
+    urls = [f"https://www.example.com/store/{name}" for name in ("nike", "adidas", "kmart")]
+
+    results = run_batch(scraper, FakeCompletions(), urls)
+
+    assert [result["merchant"] for result in results] == ["nike", "adidas", "kmart"]
+    assert [result["url"] for result in results] == urls
+    assert [result["cashback_offer"] for result in results] == ["1%", "2%", "3%"]
+    assert sum(result["tokens_used"] for result in results) == 120
+
+
+def test_truncated_batch_is_split_until_it_fits(scraper):
+    urls = [f"https://www.example.com/store/shop{i}" for i in range(4)]
+    completions = FakeCompletions(max_items=1)
+
+    results = run_batch(scraper, completions, urls)
+
+    assert completions.batch_sizes == [4, 2, 2, 1, 1, 1, 1]
+    assert [result["merchant"] for result in results] == [f"shop{i}" for i in range(4)]
+
+
+def test_pages_missing_from_reply_get_no_result(scraper):
+    class DropLast(FakeCompletions):
+        async def create(self, **request):
+            response = await super().create(**request)
+            data = orjson.loads(response.choices[0].message.content)
+            response.choices[0].message.content = orjson.dumps({"results": data["results"][:-1]}).decode()
+            return response
+
+    results = run_batch(scraper, DropLast(), ["https://www.example.com/store/a", "https://www.example.com/store/b"])
+
+    assert results[0]["merchant"] == "a"
+    assert results[1] is None
+
+
+@pytest.mark.parametrize("reply", [
+    '{"merchant_name": "Nike", "cashback_offer": "7%"}',
+    '```json\n{"merchant_name": "Nike", "cashback_offer": "7%"}\n```',
+    'Here is the data: {"merchant_name": "Nike", "cashback_offer": "7%"} Let me know if you need more.',
+    'Result {"merchant_name": "Nike", "cashback_offer": "7%"} (also see {note})',
+])
+def test_extract_json_ignores_wrapping(reply):
+    assert _extract_json(reply) == {"merchant_name": "Nike", "cashback_offer": "7%"}
+
+
+def test_extract_json_without_object():
+    assert _extract_json("No cashback offer found on this page.") is None
+    assert _extract_json('["not", "an", "object"]') is None
+
+
+def test_flat_levels_are_written_as_is(scraper):
+    results = [{"merchant": "Nike", "cashback_offer": "7%"}]
+
+    fieldnames, rows = scraper.csv_rows(results, "basic")
+
+    assert fieldnames == RESULT_FIELDNAMES["basic"]
+    assert rows is results
+
+
+def test_comprehensive_results_are_flattened(scraper):
+    result = {
+        "basic_info": {"merchant_name": "Nike", "cashback_offer": "7%", "offer_type": "percentage"},
+        "competitive_positioning": {"market_position": "leader", "unique_selling_points": ["fast", "cheap"]},
+        "offer_intelligence": None,
+        "pokitpal_strategic_recommendations": ["undercut", "partner"],
+        "data_quality": {"extraction_confidence": 0.9, "data_completeness": 0.8, "analysis_reliability": 0.85},
+        "extraction_metadata": {"tokens_used": 500, "url": "https://www.example.com/store/nike"},
+    }
+
+    fieldnames, rows = scraper.csv_rows([result], "comprehensive")
+    row, = rows
+
+    assert fieldnames == COMPREHENSIVE_FIELDNAMES
+    assert set(row) == set(COMPREHENSIVE_FIELDNAMES)
+    assert row["merchant_name"] == "Nike"
+    assert row["unique_selling_points"] == "fast; cheap"
+    assert row["competitive_advantages"] == ""
+    assert row["special_conditions"] == ""
+    assert (row["pokitpal_recommendation_1"], row["pokitpal_recommendation_3"]) == ("undercut", "")
+    assert row["analysis_reliability"] == 0.85
+    assert (row["tokens_used"], row["cost"]) == (500, "")